@@ -22,4 +22,5 @@ setup(name='yamlui',
       author='Adam Coldrick',
       author_email='adam@sotk.co.uk',
       url='http://www.sotk.co.uk',
-      packages=['yamlui'],)
+      packages=['yamlui'],
+      requires=['pygame (>=1.9.4)', 'PyYAML', 'six'],)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare yamlui.util.wrap_text against the old prefix-measuring version.
+
+Checks that both give the same output for a range of paragraphs, fonts
+and widths, then times each of them on increasingly long paragraphs. It
+can be run using `PYTHONPATH="$PYTHONPATH:." python tests/bench_wrap.py`.
+
+"""
+
+import random
+import timeit
+
+import pygame
+
+from yamlui import fonts
+from yamlui import util
+
+
+def old_wrap_text(text, font, width):
+    text_lines = text.replace('\t', '    ').split('\n')
+    if width is None or width == 0:
+        return text_lines
+
+    wrapped_lines = []
+    for line in text_lines:
+        line = line.rstrip() + ' '
+        if line == ' ':
+            wrapped_lines.append(line)
+            continue
+
+        start = len(line) - len(line.lstrip())
+        start = line.index(' ', start)
+        while start + 1 < len(line):
+            next = line.index(' ', start + 1)
+            if font.size(line[:next])[0] <= width:
+                start = next
+            else:
+                wrapped_lines.append(line[:start])
+                line = line[start+1:]
+                start = line.index(' ')
+        line = line[:-1]
+        if line:
+            wrapped_lines.append(line)
+    return wrapped_lines
+
+
+WORDS = ('These options allow you to customise the settings used by the '
+         'map generator when generating your world. Township Riofaal the '
+         'Magnificent Ikadir 10th, 2,000 villagers! (approximately) a I '
+         'supercalifragilisticexpialidocious').split()
+
+
+def paragraph(rng, words):
+    text = []
+    for _ in range(words):
+        text.append(rng.choice(WORDS))
+        text.append(rng.choice(['  ', ' ', ' ', ' ', ' ', '\n', '\t']))
+    return ' ' + ''.join(text)
+
+
+def check(rng):
+    checked = 0
+    for size in (10, 12, 14, 18, 24, 36):
+        font = fonts.make_font('arial', size)
+        for width in (1, 40, 120, 300, 605):
+            for words in (1, 2, 5, 20, 80):
+                text = paragraph(rng, words)
+                expected = old_wrap_text(text, font, width)
+                actual = util.wrap_text(text, font, width)
+                assert actual == expected, (text, size, width)
+                checked += 1
+    print('%d inputs wrapped identically' % checked)
+
+
+def bench(rng):
+    font = fonts.make_font('arial', 14)
+    print('%8s %12s %12s' % ('words', 'old (ms)', 'new (ms)'))
+    for words in (50, 200, 800, 3200):
+        text = paragraph(rng, words).replace('\n', ' ')
+        runs = 3
+        old = timeit.timeit(
+            lambda: old_wrap_text(text, font, 605), number=runs)
+        new = timeit.timeit(
+            lambda: util.wrap_text(text, font, 605), number=runs)
+        print('%8d %12.2f %12.2f' %
+              (words, old * 1000 / runs, new * 1000 / runs))
+
+
+pygame.font.init()
+
+rng = random.Random(1)
+check(rng)
+bench(rng)
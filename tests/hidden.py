@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Check that hidden clipping containers and lists aren't drawn.
+
+Renders the UI defined by `examples/hidden.yaml`, where both start
+hidden, then shows and hides them again, checking which colours end up
+on the window each time. The UI is then built again in lazy mode, to
+check that looking up a hidden widget inside another hidden widget
+builds both of them. It can be run using
+`PYTHONPATH="$PYTHONPATH:." python tests/hidden.py`.
+
+"""
+
+import pygame
+
+import yamlui
+
+
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+
+
+def colours(window):
+    surface = window.surface
+    found = set()
+    for x in range(0, surface.get_width(), 5):
+        for y in range(0, surface.get_height(), 5):
+            found.add(tuple(surface.get_at((x, y)))[:3])
+    return found
+
+
+def check(window, expected):
+    window.update()
+    window.draw()
+    found = colours(window)
+    for colour in (RED, BLUE):
+        assert (colour in found) == (colour in expected), (colour, found)
+
+
+pygame.init()
+
+window = yamlui.generate_ui('examples/hidden.yaml', cache=False)
+tree = yamlui.trees['hidden.yaml']
+clipped = tree['clipped']
+listview = tree['list']
+
+assert clipped.get_bounds() is None
+assert listview.get_bounds() is None
+check(window, ())
+
+clipped.show()
+check(window, (RED,))
+listview.show()
+check(window, (RED, BLUE))
+
+clipped.hide()
+listview.hide()
+check(window, ())
+print('Hidden widgets were not drawn')
+
+del yamlui.trees['hidden.yaml']
+window = yamlui.generate_ui('examples/hidden.yaml', cache=False, lazy=True)
+tree = yamlui.trees['hidden.yaml']
+inner = tree['inner']
+assert not hasattr(inner, 'materialise'), inner
+assert tree['outer'].children == [inner]
+assert tree['inner'] is inner
+inner.set_text('Built')
+print('Nested hidden widgets were built when looked up')
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# Copyright (c) 2016 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import pygame
+
+import yamlui
+
+
+lines = [(number, 'Log message number %d' % number)
+         for number in range(50000)]
+
+
+@yamlui.callback('log_lines')
+def log_lines():
+    return lines
+
+
+pygame.init()
+
+window = yamlui.generate_ui('examples/list.yaml')
+yamlui.run(window, fps=60)
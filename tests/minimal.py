@@ -22,9 +22,4 @@ import yamlui
 pygame.init()
 
 window = yamlui.generate_ui('examples/minimal.yaml')
-
-while True:
-    for event in pygame.event.get():
-        window.handle_event(event)
-    window.update()
-    window.draw()
+yamlui.run(window, fps=60)
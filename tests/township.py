@@ -20,7 +20,7 @@ import pygame
 import yamlui
 
 
-class Villager(object):
+class Villager(yamlui.Observable):
     def __init__(self, name):
         self.name = name
 
@@ -29,7 +29,7 @@ class Villager(object):
 
 
 @yamlui.callback('get_setup')
-class GameSetup(object):
+class GameSetup(yamlui.Observable):
 
     villagers = [Villager('Riofaal the Magnificent')]
 
@@ -49,6 +49,7 @@ class GameSetup(object):
         print(kwargs)
         return True
 
+    @yamlui.binding.depends('villagers')
     def villager_count(self, event=None, widget=None, **kwargs):
         return str(len(self.villagers))
 
@@ -56,11 +57,13 @@ class GameSetup(object):
         if len(self.villagers) < 10:
             self.villagers.append(
                 Villager('Ikadir the %dth' % len(self.villagers)))
+            self.changed('villagers')
         return True
 
     def remove_villager(self, event, widget, **kwargs):
         if len(self.villagers) > 1:
             self.villagers.pop()
+            self.changed('villagers')
         return True
 
 
@@ -68,9 +71,4 @@ pygame.init()
 
 path = 'examples/testui/newgame.yaml'
 window = yamlui.generate_ui(path)
-
-while True:
-    for event in pygame.event.get():
-        window.handle_event(event)
-    window.update()
-    window.draw()
+yamlui.run(window, fps=60)
@@ -13,10 +13,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from yamlui import binding
+from yamlui.binding import Observable
+from yamlui.binding import ObservableProxy
 from yamlui.button import Button
 from yamlui.container import Container
 from yamlui.decorators import callback, widget
 from yamlui.label import Label
+from yamlui.listview import ListView
+from yamlui.loop import run
 from yamlui.parsing import generate_ui
 from yamlui.textbox import TextBox
 from yamlui.window import Window
@@ -27,12 +32,19 @@ class_mapping = {
     'container': Container,
     'label': Label,
     'button': Button,
-    'textbox': TextBox
+    'textbox': TextBox,
+    'list': ListView,
+    'scroll': ListView,
 }
 
-callbacks = {}
+callbacks = binding.CallbackRegistry()
 trees = {}
 
+#: When True, widgets check that their cached callback lookups still give
+#: the same result as looking the callback up again, and raise an
+#: exception if not.
+debug_callbacks = False
+
 
 def get_callback(key=None, widget=None):
     if key is None:
@@ -51,6 +63,43 @@ def get_callback(key=None, widget=None):
     return callbacks.get(key)
 
 
+def get_bound_object(key=None, widget=None):
+    """Find the bound object which provides a given key for a widget.
+
+    This looks in the same places as `get_callback`, apart from the
+    callbacks dictionary.
+
+    :returns: The object bound to the widget or its closest ancestor which
+        has an attribute called `key`, or None if there isn't one.
+
+    """
+    if key is None:
+        return None
+
+    current = widget
+    while current is not None:
+        if (current.bound_object is not None and
+                hasattr(current.bound_object, key)):
+            return current.bound_object
+        current = current.parent
+    return None
+
+
+def get_setter_target(widget=None):
+    """Find the object a two-way binding for a widget should be set on.
+
+    This is the object bound to the widget or its closest ancestor, in
+    the same way as `two_way_callback`.
+
+    """
+    current = widget
+    while current is not None:
+        if current.bound_object is not None:
+            return current.bound_object
+        current = current.parent
+    return None
+
+
 def two_way_callback(key=None, widget=None, method='get', value=None):
     if method == 'get':
         return get_callback(key, widget)
@@ -0,0 +1,74 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Command line tools for preparing yamlui UIs, run with python -m yamlui."""
+
+import argparse
+import sys
+
+from yamlui import fonts
+from yamlui import loader
+
+
+def warm(args):
+    for path, filename in zip(args.paths,
+                              loader.warm(args.paths, args.cache_dir)):
+        print('%s -> %s' % (path, filename))
+    return 0
+
+
+def index_fonts(args):
+    if args.clear:
+        fonts.clear_index()
+    for name in args.names:
+        print('%s -> %s' % (name, fonts.resolve(name)))
+    fonts.save_index()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m yamlui')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    warm_parser = subparsers.add_parser(
+        'warm', help='pre-compile UI definitions into the cache',
+        description='Pre-compile yamlui definitions into the cache. Run '
+                    'this from the directory the UI will be loaded from, '
+                    'since includes are relative to it.')
+    warm_parser.add_argument('paths', nargs='+', metavar='PATH',
+                             help='path to a YAML UI definition')
+    warm_parser.add_argument('--cache-dir',
+                             help='cache directory to use (default: %s)' %
+                             loader.default_cache_dir())
+    warm_parser.set_defaults(func=warm)
+
+    fonts_parser = subparsers.add_parser(
+        'fonts', help='find the files system fonts resolve to',
+        description='Find the files system fonts resolve to, and save them '
+                    'in the font index at %s.' % fonts.index_path())
+    fonts_parser.add_argument('names', nargs='*', metavar='NAME',
+                              help='name of a system font')
+    fonts_parser.add_argument('--clear', action='store_true',
+                              help='forget previously found fonts first, '
+                                   'after installing or removing fonts')
+    fonts_parser.set_defaults(func=index_fonts)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,235 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Change notification for objects which widgets are bound to.
+
+Widgets with a `content-bind` property normally poll their binding every
+frame to see if it has changed. If the object providing the binding is
+`Observable`, the widget is instead told when the object changes, and
+only then re-renders.
+
+Example usage::
+
+    @yamlui.callback('get_setup')
+    class GameSetup(yamlui.Observable):
+
+        def __init__(self, event, widget):
+            self.villagers = []
+
+        @yamlui.binding.depends('villagers')
+        def villager_count(self):
+            return str(len(self.villagers))
+
+        def add_villager(self, event, widget):
+            self.villagers.append(Villager())
+            self.changed('villagers')
+
+"""
+
+import weakref
+
+import yamlui
+
+
+# Incremented whenever something which affects callback lookups changes,
+# so that widgets know to look their callbacks up again.
+_generation = 0
+
+
+def callbacks_changed():
+    """Invalidate every widget's cached callback lookups.
+
+    This is called automatically when `yamlui.callbacks` is modified or a
+    widget's `bound_object` is changed. Call it after changing anything else
+    which affects what `yamlui.get_callback` returns, such as adding a
+    method to a bound object.
+
+    """
+    global _generation
+    _generation += 1
+
+
+def generation():
+    """Return a number which changes whenever callback lookups may have."""
+    return _generation
+
+
+class CallbackRegistry(dict):
+
+    """The dict of callbacks registered with `yamlui.callback`.
+
+    Modifying it invalidates the callback lookups cached by widgets.
+
+    """
+
+    def __setitem__(self, key, value):
+        super(CallbackRegistry, self).__setitem__(key, value)
+        callbacks_changed()
+
+    def __delitem__(self, key):
+        super(CallbackRegistry, self).__delitem__(key)
+        callbacks_changed()
+
+    def clear(self):
+        super(CallbackRegistry, self).clear()
+        callbacks_changed()
+
+    def pop(self, *args):
+        value = super(CallbackRegistry, self).pop(*args)
+        callbacks_changed()
+        return value
+
+    def popitem(self):
+        item = super(CallbackRegistry, self).popitem()
+        callbacks_changed()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super(CallbackRegistry, self).setdefault(key, default)
+        callbacks_changed()
+        return value
+
+    def update(self, *args, **kwargs):
+        super(CallbackRegistry, self).update(*args, **kwargs)
+        callbacks_changed()
+
+
+def depends(*attributes):
+    """Return a decorator declaring which attributes a method depends on.
+
+    Widgets bound to the decorated method are only notified when one of
+    the given attributes changes. By default, widgets bound to a method
+    are notified whenever anything about the object changes.
+
+    :param attributes: The names of the attributes the method uses.
+
+    """
+    def _decorator(fn):
+        fn.yamlui_depends = attributes
+        return fn
+    return _decorator
+
+
+class Observable(object):
+
+    """Mixin for objects which tell widgets bound to them about changes.
+
+    Setting a public attribute notifies the widgets which depend on it
+    automatically. Other changes, such as appending to a list attribute,
+    need reporting by calling `changed`.
+
+    """
+
+    def __setattr__(self, name, value):
+        super(Observable, self).__setattr__(name, value)
+        if not name.startswith('_'):
+            self.changed(name)
+
+    def _watchers(self):
+        watchers = self.__dict__.get('_yamlui_watchers')
+        if watchers is None:
+            watchers = {}
+            object.__setattr__(self, '_yamlui_watchers', watchers)
+        return watchers
+
+    def watch(self, widget, attribute=None):
+        """Notify a widget when an attribute changes.
+
+        :param widget: The widget to notify, by calling its
+            `binding_changed` method. Only a weak reference is kept.
+        :param attribute: (Optional) The attribute the widget depends on.
+            If not given, the widget is notified of any change.
+
+        """
+        watchers = self._watchers()
+        watchers.setdefault(attribute, weakref.WeakSet()).add(widget)
+
+    def unwatch(self, widget):
+        """Stop notifying a widget about changes.
+
+        :param widget: The widget to stop notifying.
+
+        """
+        for widgets in self._watchers().values():
+            widgets.discard(widget)
+
+    def changed(self, attribute=None):
+        """Report a change to the widgets which depend on it.
+
+        :param attribute: (Optional) The attribute which changed. If not
+            given, every widget watching this object is notified.
+
+        """
+        watchers = self.__dict__.get('_yamlui_watchers')
+        if not watchers:
+            return
+        if attribute is None:
+            affected = set()
+            for widgets in watchers.values():
+                affected.update(widgets)
+        else:
+            affected = set(watchers.get(attribute, ()))
+            affected.update(watchers.get(None, ()))
+        for widget in affected:
+            widget.binding_changed()
+
+
+class ObservableProxy(Observable):
+
+    """Wraps an object so that setting attributes on it notifies widgets.
+
+    Only attributes set through the proxy are noticed. Changes made some
+    other way, for example by the wrapped object's own methods, need
+    reporting by calling `changed` on the proxy.
+
+    """
+
+    def __init__(self, target):
+        object.__setattr__(self, '_target', target)
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+        self.changed(name)
+
+    def __repr__(self):
+        return repr(self._target)
+
+
+def watch_binding(widget, key):
+    """Arrange for a widget to be notified when its binding changes.
+
+    :param widget: The bound widget.
+    :param key: The name of the attribute or method it is bound to.
+    :returns: True if the binding is observable, False if the widget
+        needs to poll it for changes instead.
+
+    """
+    owner = yamlui.get_bound_object(key, widget)
+    if not isinstance(owner, Observable):
+        return False
+
+    value = getattr(owner, key)
+    if callable(value):
+        attributes = getattr(value, 'yamlui_depends', (None,))
+    else:
+        attributes = (key,)
+    for attribute in attributes:
+        owner.watch(widget, attribute)
+    widget.watching.append(owner)
+    return True
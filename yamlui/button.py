@@ -15,9 +15,9 @@
 
 import pygame
 
-import yamlui
 from yamlui import fonts
 from yamlui import util
+from yamlui.widget import MOUSE_EVENTS
 from yamlui.widget import Widget
 
 
@@ -79,6 +79,8 @@ class Button(Widget):
         super(Button, self).__init__(definition, style=style, parent=parent)
 
         self.state = 'idle'
+        self.hovered = False
+        self.mouse_over = False
         self.surface = util.create_surface(self, ButtonSurface)
         self.hover_surface = util.create_surface(
             self, ButtonSurface,
@@ -100,13 +102,20 @@ class Button(Widget):
 
     def render_content(self):
         if 'content-image' in self._properties:
-            self.rendered_content = pygame.image.load(
-                self._properties['content-image']).convert_alpha()
+            self.rendered_content = self.use_image(
+                self._properties['content-image'])
         elif 'text' in self._properties:
             self.rendered_content = self._render_text()
 
     def handle_event(self, event):
         """Handle an event."""
+        handled = self._handle_click(event)
+        if event.type in MOUSE_EVENTS:
+            # Clicking or releasing the button can change its look.
+            self.update_hover()
+        return handled
+
+    def _handle_click(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and self.state == 'idle':
             if not self.surface.rect.collidepoint(pygame.mouse.get_pos()):
                 return False
@@ -116,20 +125,37 @@ class Button(Widget):
             if not self.surface.rect.collidepoint(pygame.mouse.get_pos()):
                 self.state = 'idle'
                 return False
-            cb = yamlui.get_callback(self._properties.get('on-click'), self)
+            cb = self.resolve_callback(self._properties.get('on-click'))
             if cb is None:
                 return False
             self.state = 'idle'
             return cb(event, self, **self._cb_args)
         return False
 
-    def set_relative_position(self):
-        x, y = self.parent.surface.rect.topleft
-        dx, dy = self._properties['position']
-        self.surface.rect.x = x + dx
-        self.surface.rect.y = y + dy
-        self.hover_surface.rect.x = x + dx
-        self.hover_surface.rect.y = y + dy
+    def hover_entered(self):
+        self.mouse_over = True
+        self.update_hover()
+
+    def hover_left(self):
+        self.mouse_over = False
+        self.update_hover()
+
+    def update_hover(self):
+        """Track whether the button should be drawn in its hover state."""
+        hovered = self.mouse_over or self.state == 'clicking'
+        if hovered != self.hovered:
+            self.hovered = hovered
+            self.mark_dirty()
+
+    def captures_mouse(self):
+        return self.state != 'idle'
+
+    def get_surfaces(self):
+        return [self.surface, self.hover_surface]
+
+    def collect_draw(self, surface, blits):
+        blits.append((self.hover_surface if self.hovered else self.surface,
+                      self.surface.rect))
 
     def draw(self, surface):
         """Draw the button onto the given surface.
@@ -137,11 +163,7 @@ class Button(Widget):
         :param surface: The surface to draw on.
 
         """
-        if self._properties.get('display') == 'relative' and self.parent:
-            self.set_relative_position()
-
-        if self.surface.rect.collidepoint(pygame.mouse.get_pos())\
-                or self.state == 'clicking':
+        if self.hovered:
             self.hover_surface.draw(surface)
         else:
             self.surface.draw(surface)
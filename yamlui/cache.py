@@ -0,0 +1,130 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+
+
+class LRUCache(object):
+
+    """A size-bounded cache which evicts the least recently used entries.
+
+    Each entry has a size, given by the `sizeof` function passed in when
+    creating the cache. Whenever the total size of the entries is greater
+    than the budget, entries are evicted until it fits again, starting
+    with the one which was used longest ago.
+
+    """
+
+    def __init__(self, budget, sizeof=None):
+        """Initialise the cache.
+
+        :param budget: The maximum total size of the cached entries.
+        :param sizeof: (Optional) A function which returns the size of a
+            cached value. If not given, every entry has a size of 1, so the
+            budget is a maximum number of entries.
+
+        """
+        self.budget = budget
+        self.sizeof = sizeof or (lambda value: 1)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Get a value from the cache, marking it as recently used.
+
+        :param key: The key to look up.
+        :param default: The value to return if the key isn't cached.
+
+        """
+        try:
+            entry = self._entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries[key] = entry
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        """Add a value to the cache, evicting old entries if needed.
+
+        Values which are larger than the whole budget are not cached.
+
+        :param key: The key to store the value under.
+        :param value: The value to store.
+        :returns: The value that was stored.
+
+        """
+        self.discard(key)
+        size = self.sizeof(value)
+        if size > self.budget:
+            return value
+        self._entries[key] = (value, size)
+        self.size += size
+        self._evict()
+        return value
+
+    def discard(self, key):
+        """Remove a key from the cache, if it is there.
+
+        :param key: The key to remove.
+
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def set_budget(self, budget):
+        """Change the budget, evicting entries if it is now exceeded.
+
+        :param budget: The new maximum total size of the cached entries.
+
+        """
+        self.budget = budget
+        self._evict()
+
+    def clear(self):
+        """Remove all the entries and reset the statistics."""
+        self._entries.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Return a dict describing how the cache is performing."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'size': self.size,
+            'budget': self.budget
+        }
+
+    def _evict(self):
+        while self.size > self.budget and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
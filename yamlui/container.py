@@ -17,6 +17,7 @@ import pygame
 
 from yamlui.parsing import parse_children
 from yamlui.util import create_surface
+from yamlui.util import flush_blits
 from yamlui.widget import Widget
 
 
@@ -45,10 +46,81 @@ class ContainerSurface(pygame.Surface):
         :param surface: The pygame Surface to draw on.
 
         """
-        # TODO(SotK): Handle relative positioning
         surface.blit(self, self.rect)
 
 
+def _premultiplied(source):
+    """Return a copy of a surface with its alpha premultiplied.
+
+    Any per-surface alpha is folded into the per-pixel alpha first, so
+    that the result can be blitted using BLEND_PREMULTIPLIED.
+
+    :param source: The surface to convert.
+
+    """
+    if not source.get_masks()[3]:
+        source = source.convert_alpha()
+    result = pygame.Surface(source.get_size(), flags=pygame.SRCALPHA)
+    result.fill((0, 0, 0, 0))
+    result.blit(source, (0, 0))
+    if hasattr(result, 'premul_alpha'):
+        return result.premul_alpha()
+
+    # Surface.premul_alpha is new in pygame 2.2, so with older versions
+    # the colours are multiplied by a surface whose colour is the alpha.
+    white = result.copy()
+    white.fill((255, 255, 255), special_flags=pygame.BLEND_RGB_MAX)
+    alpha = pygame.Surface(result.get_size())
+    alpha.fill((0, 0, 0))
+    alpha.blit(white, (0, 0))
+    result.blit(alpha, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+    return result
+
+
+class CompositeTarget(object):
+
+    """A stand-in for the screen used when compositing a subtree.
+
+    Widgets draw themselves at their on-screen position. This translates
+    those positions onto an offscreen surface whose top left corner is at
+    `origin` on screen, and accumulates premultiplied alpha so that the
+    result looks the same when blitted with BLEND_PREMULTIPLIED.
+
+    """
+
+    def __init__(self, surface, origin):
+        """Initialise the target.
+
+        :param surface: The offscreen surface to draw on.
+        :param origin: The screen position of the top left of `surface`.
+
+        """
+        self.surface = surface
+        self.origin = origin
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        if isinstance(dest, pygame.Rect):
+            dest = dest.topleft
+        dest = (dest[0] - self.origin[0], dest[1] - self.origin[1])
+        if special_flags == 0:
+            source = _premultiplied(source)
+            special_flags = pygame.BLEND_PREMULTIPLIED
+        return self.surface.blit(source, dest, area, special_flags)
+
+    def get_clip(self):
+        return self.surface.get_clip().move(self.origin)
+
+    def set_clip(self, rect):
+        if rect is not None:
+            rect = pygame.Rect(rect).move(-self.origin[0], -self.origin[1])
+        self.surface.set_clip(rect)
+
+    def blits(self, blit_sequence, doreturn=True):
+        rects = [self.blit(*args) for args in blit_sequence]
+        if doreturn:
+            return rects
+
+
 class Container(Widget):
 
     """A container to hold a set of widgets.
@@ -73,49 +145,143 @@ class Container(Widget):
               position: (10, 10)
               display: relative
 
+    If the `cache` property is set, the container keeps an offscreen copy
+    of itself and its descendants. The copy is only redrawn when one of
+    the descendants reports a change, otherwise the whole container is
+    drawn with a single blit.
+
+    If the `clip` property is set, the container's descendants are only
+    drawn inside the container, rather than overflowing it.
+
     """
 
     def __init__(self, definition, style={}, parent=None):
         super(Container, self).__init__(definition, style=style, parent=parent)
 
         self.state = 'idle'
+        self.cached = self._properties.get('cache', False)
+        self.clip = self._properties.get('clip', False)
+        self.composite = None
+        self.composite_offset = (0, 0)
         self.surface = create_surface(self, ContainerSurface)
         self.children = parse_children(definition, widget=self, style=style)
 
+    def invalidate(self, rect):
+        """Discard the cached composite, since part of it has changed."""
+        self.composite = None
+
+    def recomposite(self):
+        """Redraw the cached composite of this container's subtree."""
+        bounds = self.get_bounds()
+        self.composite = pygame.Surface(bounds.size, flags=pygame.SRCALPHA)
+        self.composite.fill((0, 0, 0, 0))
+        self.composite_offset = (bounds.x - self.surface.rect.x,
+                                 bounds.y - self.surface.rect.y)
+        target = CompositeTarget(self.composite, bounds.topleft)
+        blits = []
+        self.collect_contents(target, blits)
+        flush_blits(target, blits)
+
+    def compute_bounds(self):
+        if not self.visible:
+            return None
+        if self.clip:
+            return pygame.Rect(self.rect)
+        return super(Container, self).compute_bounds()
+
+    def child_clip(self):
+        return self.rect if self.clip else None
+
     def handle_event(self, event):
         """Handle an event."""
         handled = False
         for child in reversed(self.children):
+            if not child.visible:
+                continue
             handled = child.handle_event(event)
             if handled:
                 return handled
 
         if not handled:
-            if self.surface.rect.collidepoint(pygame.mouse.get_pos()) > 0:
-                if event.type == pygame.MOUSEBUTTONDOWN and self.state == 'idle':
-                    self.state = 'drag'
-                    return True
-                elif event.type == pygame.MOUSEBUTTONUP and self.state != 'idle':
-                    self.state = 'idle'
-                    return True
-                return False
-
-    def update(self):
-        """Update the container and its contents."""
-        if self.state == 'dragging':
-            dx, dy = pygame.mouse.get_rel()
-            self.surface.rect.x += dx
-            self.surface.rect.y += dy
-        elif self.state == 'drag':
-            pygame.mouse.get_rel()
-            self.state = 'dragging'
-
-        for child in self.children:
-            child.update()
+            return self.handle_own_event(event)
+
+    def handle_own_event(self, event):
+        """Handle an event for the container itself."""
+        if event.type == pygame.MOUSEMOTION and self.state == 'drag':
+            # The container follows the mouse while being dragged.
+            self.move_by(*event.rel)
+            return True
+        if self.surface.rect.collidepoint(pygame.mouse.get_pos()) > 0:
+            if event.type == pygame.MOUSEBUTTONDOWN and self.state == 'idle':
+                self.state = 'drag'
+                return True
+            elif event.type == pygame.MOUSEBUTTONUP and self.state != 'idle':
+                self.state = 'idle'
+                return True
+            return False
+
+    def captures_mouse(self):
+        return self.state != 'idle'
+
+    def move_by(self, dx, dy):
+        """Move the container and its relative children.
+
+        :param dx: How far to move right, in pixels.
+        :param dy: How far to move down, in pixels.
+
+        """
+        if not (dx or dy):
+            return
+        old_bounds = self.get_bounds()
+        self.surface.rect.x += dx
+        self.surface.rect.y += dy
+        self.rect_changed()
+        self.layout_children()
+        # Any children which don't move with the container make the
+        # cached composite out of date.
+        if self.cached and not all(
+                child._properties.get('display') == 'relative'
+                for child in self.children):
+            self.composite = None
+        # Relative children moved with the container, so the changed area
+        # is the old bounds plus their new position.
+        if self.parent is not None:
+            self.parent.mark_dirty(old_bounds.union(old_bounds.move(dx, dy)))
+
+    def collect_draw(self, surface, blits):
+        if self.cached:
+            if self.composite is None:
+                self.recomposite()
+            x, y = self.surface.rect.topleft
+            dx, dy = self.composite_offset
+            blits.append((self.composite, (x + dx, y + dy), None,
+                          pygame.BLEND_PREMULTIPLIED))
+        else:
+            self.collect_contents(surface, blits)
+
+    def collect_contents(self, surface, blits):
+        """Collect the blits for the container and its children.
+
+        :param surface: The surface being drawn on.
+        :param blits: The list of blits to add to.
+
+        """
+        blits.append((self.surface, self.surface.rect))
+        if not self.clip:
+            self.collect_children(surface, blits)
+            return
+
+        # The clip area can't change part way through a call to blits, so
+        # the children are drawn separately.
+        flush_blits(surface, blits)
+        old_clip = surface.get_clip()
+        surface.set_clip(old_clip.clip(self.surface.rect))
+        self.collect_children(surface, blits)
+        flush_blits(surface, blits)
+        surface.set_clip(old_clip)
 
     def draw(self, surface):
         """Draw the container and its contents on the given surface."""
-        self.surface.draw(surface)
-
-        for child in self.children:
-            child.draw(surface)
+        blits = []
+        self.collect_draw(surface, blits)
+        flush_blits(surface, blits)
@@ -0,0 +1,147 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+class GapBuffer(object):
+
+    """Editable text with a cursor, used by text boxes.
+
+    The characters are kept in a list with a gap at the cursor, so
+    inserting or deleting next to the cursor doesn't move the rest of the
+    text. Moving the cursor moves the characters between its old and new
+    positions across the gap.
+
+    """
+
+    def __init__(self, text='', capacity=16):
+        """Initialise the buffer, with the cursor at the end of the text.
+
+        :param text: (Optional) The initial text.
+        :param capacity: (Optional) The initial size of the gap.
+
+        """
+        self._chars = []
+        self._start = 0
+        self._end = 0
+        self._capacity = capacity
+        self.set_text(text)
+
+    def __len__(self):
+        return len(self._chars) - (self._end - self._start)
+
+    def __getitem__(self, index):
+        """Return the character at a position in the text."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('GapBuffer index out of range')
+        if index >= self._start:
+            index += self._end - self._start
+        return self._chars[index]
+
+    def __str__(self):
+        return self.text()
+
+    @property
+    def cursor(self):
+        """The position of the cursor, from 0 to the length of the text."""
+        return self._start
+
+    def text(self, start=0, end=None):
+        """Return some or all of the text.
+
+        :param start: (Optional) The position to start at.
+        :param end: (Optional) The position to end before. Defaults to the
+            end of the text.
+
+        """
+        length = len(self)
+        end = length if end is None else min(end, length)
+        start = max(0, start)
+        if start >= end:
+            return ''
+        gap = self._end - self._start
+        if end <= self._start:
+            chars = self._chars[start:end]
+        elif start >= self._start:
+            chars = self._chars[start + gap:end + gap]
+        else:
+            chars = (self._chars[start:self._start] +
+                     self._chars[self._end:end + gap])
+        return ''.join(chars)
+
+    def set_text(self, text):
+        """Replace all of the text, and move the cursor to the end.
+
+        :param text: The new text.
+
+        """
+        self._chars = list(text) + [None] * self._capacity
+        self._start = len(text)
+        self._end = len(self._chars)
+
+    def move_to(self, position):
+        """Move the cursor.
+
+        :param position: The new position, which is clamped to the text.
+
+        """
+        position = max(0, min(position, len(self)))
+        gap = self._end - self._start
+        if position < self._start:
+            moved = self._chars[position:self._start]
+            self._chars[position + gap:self._end] = moved
+        elif position > self._start:
+            moved = self._chars[self._end:position + gap]
+            self._chars[self._start:position] = moved
+        self._start = position
+        self._end = position + gap
+
+    def insert(self, text):
+        """Insert text at the cursor, leaving the cursor after it.
+
+        :param text: The text to insert.
+
+        """
+        if len(text) > self._end - self._start:
+            # Grow the gap in proportion to the text, so that typing takes
+            # amortised constant time.
+            extra = max(len(text), len(self._chars))
+            self._chars[self._end:self._end] = [None] * extra
+            self._end += extra
+        self._chars[self._start:self._start + len(text)] = list(text)
+        self._start += len(text)
+
+    def delete_before(self, count=1):
+        """Delete characters before the cursor, like backspace.
+
+        :param count: (Optional) How many characters to delete.
+        :returns: Whether anything was deleted.
+
+        """
+        count = min(count, self._start)
+        self._start -= count
+        return count > 0
+
+    def delete_after(self, count=1):
+        """Delete characters after the cursor, like the delete key.
+
+        :param count: (Optional) How many characters to delete.
+        :returns: Whether anything was deleted.
+
+        """
+        count = min(count, len(self._chars) - self._end)
+        self._end += count
+        return count > 0
@@ -0,0 +1,146 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import bisect
+
+
+class FocusManager(object):
+
+    """Keeps track of which widget in a UI tree has the keyboard focus.
+
+    At most one widget has focus at a time, and keyboard events are given
+    straight to it. The order that the tab key moves focus in is worked
+    out when the manager is created or `rebuild` is called, and kept up to
+    date by `add_tree` and `remove_tree` as widgets join and leave the tree.
+    Widgets with a `tab-index` property come first, in ascending order,
+    followed by the rest in the order they appear in the tree.
+
+    """
+
+    def __init__(self, root, index=None):
+        """Initialise the focus manager.
+
+        :param root: The root widget of the tree to manage focus for.
+        :param index: (Optional) The tree's `SpatialIndex`, used to find
+            where added widgets come in the tree. Without it, adding
+            widgets recalculates the whole tab order.
+
+        """
+        self.root = root
+        self.index = index
+        self.focused = None
+        self.tab_order = []
+        self.rebuild()
+
+    def rebuild(self):
+        """Recalculate the tab order, after widgets are added or removed."""
+        focusable = [widget for widget in self.root.walk()
+                     if widget.focusable and widget.shown]
+        self.tab_order = sorted(
+            focusable,
+            key=lambda widget: (0, widget._properties['tab-index'])
+            if 'tab-index' in widget._properties else (1, 0))
+        if self.focused is not None and self.focused not in focusable:
+            self.set_focus(None)
+
+    def _key(self, widget):
+        order = self.index.order(widget)
+        if 'tab-index' in widget._properties:
+            return (0, widget._properties['tab-index'], order)
+        return (1, 0, order)
+
+    def add_tree(self, widget):
+        """Add a widget and its descendants to the tab order.
+
+        :param widget: The widget which joined the tree.
+
+        """
+        focusable = [descendant for descendant in widget.walk()
+                     if descendant.focusable and descendant.shown]
+        if not focusable:
+            return
+        if self.index is None:
+            self.rebuild()
+            return
+        keys = [self._key(other) for other in self.tab_order]
+        for descendant in focusable:
+            key = self._key(descendant)
+            position = bisect.bisect(keys, key)
+            keys.insert(position, key)
+            self.tab_order.insert(position, descendant)
+
+    def remove_tree(self, widget):
+        """Remove a widget and its descendants from the tab order.
+
+        If one of them has the focus, the focus is removed.
+
+        :param widget: The widget which is leaving the tree.
+
+        """
+        removed = set(widget.walk())
+        if self.focused in removed:
+            self.set_focus(None)
+        self.tab_order = [other for other in self.tab_order
+                          if other not in removed]
+
+    def set_focus(self, widget):
+        """Give a widget the focus, taking it away from any other widget.
+
+        :param widget: The widget to focus, or None to remove focus.
+
+        """
+        if widget is self.focused:
+            return
+        previous = self.focused
+        self.focused = widget
+        if previous is not None:
+            previous.focus_lost()
+        if widget is not None:
+            widget.focus_gained()
+
+    def clear(self, widget=None):
+        """Remove the focus.
+
+        :param widget: (Optional) Only remove the focus if it is this widget.
+
+        """
+        if widget is None or widget is self.focused:
+            self.set_focus(None)
+
+    def cycle(self, reverse=False):
+        """Move the focus to the next widget in the tab order.
+
+        :param reverse: (Optional) If True, move to the previous widget.
+
+        """
+        if not self.tab_order:
+            return
+        step = -1 if reverse else 1
+        if self.focused in self.tab_order:
+            index = self.tab_order.index(self.focused) + step
+        else:
+            index = 0 if step > 0 else -1
+        self.set_focus(self.tab_order[index % len(self.tab_order)])
+
+    def dispatch(self, event):
+        """Give a keyboard event to the focused widget.
+
+        :param event: The event to dispatch.
+        :returns: True if the event was handled, False otherwise.
+
+        """
+        if self.focused is None:
+            return False
+        return self.focused.handle_event(event)
@@ -13,21 +13,175 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+
+"""Finding and opening the fonts used by widgets.
+
+Font names are either paths to font files, or the names of system fonts.
+Finding a system font means scanning the fonts installed on the system,
+which is slow, so the file each name resolves to is remembered in
+`fonts.json` in the cache directory (see `yamlui.loader`) and reused in
+later runs. The index is saved once fonts have been preloaded, and when
+the program exits. Opened fonts are shared between every widget using the
+same file, size and style.
+
+Like `pygame.font.SysFont`, bold and italic are emulated when the file a
+name resolves to doesn't have that style.
+
+After installing or removing fonts, call `clear_index` so that names are
+resolved again.
+
+"""
+
+import atexit
+import json
+import os
+
 import pygame
 
+from yamlui import loader
+
 if not pygame.font.get_init():
     pygame.font.init()
 
+# Bump this whenever the format of the index changes.
+INDEX_VERSION = 1
+
+_MISSING = object()
+
+# Fonts keyed on (name, size, bold, italic), and on (path, size, emulated
+# bold, emulated italic) so that names which resolve to the same file share
+# a font.
 _font_cache = {}
+_path_cache = {}
+# Font names mapped to the file they resolve to, or None if there isn't a
+# matching system font and pygame's default font is used instead.
+_index = None
+# Whether the index has changed since it was last saved.
+_index_changed = False
+
+
+def index_path(cache_dir=None):
+    """Return the path of the file the font index is saved in.
+
+    :param cache_dir: (Optional) The cache directory to use. Defaults to
+        `yamlui.loader.default_cache_dir()`.
+
+    """
+    return os.path.join(cache_dir or loader.default_cache_dir(),
+                        'fonts.json')
+
+
+def _load_index():
+    global _index
+    if _index is None:
+        _index = {}
+        try:
+            with open(index_path()) as index_file:
+                saved = json.load(index_file)
+        except (IOError, OSError, ValueError):
+            return _index
+        if isinstance(saved, dict) and saved.get('version') == INDEX_VERSION:
+            _index = saved.get('fonts', {})
+    return _index
+
+
+def save_index():
+    """Save the font index, if names have been resolved since it was saved.
+
+    This happens automatically after `preload_fonts` and at exit.
+
+    """
+    global _index_changed
+    if not _index_changed:
+        return
+    _index_changed = False
+    data = json.dumps({'version': INDEX_VERSION, 'fonts': _index},
+                      indent=1, sort_keys=True)
+    # Failing to save isn't fatal, the fonts will just be found again.
+    loader.write_atomically(index_path(), data.encode('utf-8'))
 
-def make_font(name, size):
-    cache_name = '%s_%d' % (name, size)
-    if cache_name in _font_cache:
-        return _font_cache[cache_name]
 
-    try:
-        font = pygame.font.Font(name, size)
-    except IOError:
-        font = pygame.font.SysFont(name, size)
-    _font_cache[cache_name] = font
+atexit.register(save_index)
+
+
+def clear_index():
+    """Forget which files font names resolve to, here and on disk."""
+    global _index, _index_changed
+    _index = {}
+    _index_changed = True
+    save_index()
+    _font_cache.clear()
+    _path_cache.clear()
+
+
+def is_indexed(name):
+    """Return whether a font name can be resolved without a system scan.
+
+    :param name: The font name or path.
+
+    """
+    return os.path.exists(name) or name in _load_index()
+
+
+def resolve(name, bold=False, italic=False):
+    """Return the file a font name refers to.
+
+    :param name: A path to a font file, or the name of a system font.
+    :param bold: (Optional) Whether to look for a bold system font.
+    :param italic: (Optional) Whether to look for an italic system font.
+    :returns: The path to the font file, or None if no matching system font
+        was found, meaning pygame's default font should be used.
+
+    """
+    global _index_changed
+    if os.path.exists(name):
+        return name
+    index = _load_index()
+    key = name + (':bold' if bold else '') + (':italic' if italic else '')
+    path = index.get(key, _MISSING)
+    if path is _MISSING or (path is not None and not os.path.exists(path)):
+        path = pygame.font.match_font(name, bold, italic)
+        index[key] = path
+        _index_changed = True
+    return path
+
+
+def make_font(name, size, bold=False, italic=False):
+    """Return a font, opening it if it hasn't been used before.
+
+    :param name: A path to a font file, or the name of a system font.
+    :param size: The size of the font.
+    :param bold: (Optional) Whether the font should be bold. If the file
+        found isn't a bold face, it is emboldened by pygame instead.
+    :param italic: (Optional) Whether the font should be italic. If the
+        file found isn't an italic face, it is slanted by pygame instead.
+
+    """
+    font = _font_cache.get((name, size, bold, italic))
+    if font is not None:
+        return font
+
+    path = resolve(name, bold, italic)
+    # match_font falls back to a face without the style when there isn't
+    # one, so the style is missing if that is the same file.
+    fake_bold = bold and path == resolve(name, False, italic)
+    fake_italic = italic and path == resolve(name, bold, False)
+    key = (path, size, fake_bold, fake_italic)
+    font = _path_cache.get(key)
+    if font is None:
+        font = _path_cache[key] = pygame.font.Font(path, size)
+        font.set_bold(fake_bold)
+        font.set_italic(fake_italic)
+    _font_cache[(name, size, bold, italic)] = font
     return font
+
+
+def preload_fonts(fonts):
+    """Open some fonts, so that nothing needs finding when they are used.
+
+    :param fonts: A list of (font name, size) tuples.
+
+    """
+    for name, size in fonts:
+        make_font(name, size)
+    save_index()
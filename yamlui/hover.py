@@ -0,0 +1,74 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+class HoverTracker(object):
+
+    """Keeps track of which widgets in a UI tree are under the mouse.
+
+    The widgets under the mouse are found with the tree's `SpatialIndex`
+    when the mouse moves, and again when the index changes, in case a
+    widget has moved, appeared or disappeared under the mouse. Widgets
+    are told when the mouse enters or leaves them, by calling their
+    `hover_entered` and `hover_left` methods, so they don't need to check
+    where the mouse is themselves.
+
+    """
+
+    def __init__(self, index):
+        """Initialise the hover tracker.
+
+        :param index: The `SpatialIndex` of the tree to track.
+
+        """
+        self.index = index
+        self.position = None
+        self.hovered = []
+        self._version = None
+
+    def move(self, position):
+        """Update the hovered widgets after the mouse has moved.
+
+        :param position: The new (x, y) position of the mouse.
+
+        """
+        self.position = tuple(position)
+        self._find_hovered()
+
+    def refresh(self):
+        """Update the hovered widgets if the index has changed."""
+        if self._version != self.index.version:
+            self._find_hovered()
+
+    def _find_hovered(self):
+        self._version = self.index.version
+        if self.position is None:
+            return
+        hovered = self.index.at(self.position)
+        left = set(self.hovered).difference(hovered)
+        entered = set(hovered).difference(self.hovered)
+        self.hovered = hovered
+        for widget in left:
+            widget.hover_left()
+        for widget in hovered:
+            if widget in entered:
+                widget.hover_entered()
+
+    def clear(self):
+        """Forget where the mouse is, as it has left the window."""
+        self.position = None
+        hovered, self.hovered = self.hovered, []
+        for widget in hovered:
+            widget.hover_left()
@@ -0,0 +1,198 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pygame
+
+from yamlui.cache import LRUCache
+from yamlui.util import surface_bytes
+
+
+def convert(image, mode):
+    """Convert a loaded image for drawing on the display.
+
+    :param image: The image to convert.
+    :param mode: 'alpha' to use `convert_alpha`, 'opaque' to use
+        `convert`, or None to leave the image as it is.
+
+    """
+    if mode == 'alpha':
+        return image.convert_alpha()
+    elif mode == 'opaque':
+        return image.convert()
+    return image
+
+
+class ImageCache(object):
+
+    """Images loaded from files, shared between all the widgets using them.
+
+    Images are keyed on their path and conversion mode, and are reference
+    counted. An image is never evicted while something is using it. Once
+    it is released, it is kept in an LRU cache in case it is needed again,
+    and evicted when the total size of all the images would be over the
+    budget.
+
+    Shared images mustn't be modified. Copy them first.
+
+    """
+
+    def __init__(self, budget):
+        """Initialise the cache.
+
+        :param budget: The most bytes of image data to keep.
+
+        """
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.in_use_size = 0
+        self._in_use = {}
+        self._unused = LRUCache(budget, sizeof=surface_bytes)
+        self._decoded = {}
+        self._converted = {}
+
+    def acquire(self, path, mode='alpha'):
+        """Get an image, loading it if it isn't cached.
+
+        Each call must be matched by a call to `release` once the image
+        isn't needed any more.
+
+        :param path: The path to the image file.
+        :param mode: (Optional) How to convert the image, see `convert`.
+            Defaults to 'alpha'.
+
+        """
+        key = (path, mode)
+        entry = self._in_use.get(key)
+        if entry is None:
+            image = self._converted.pop(key, None)
+            if image is None:
+                image = self._unused.get(key)
+            else:
+                self._unused.discard(key)
+            if image is None:
+                self.misses += 1
+                decoded = self._decoded.pop(path, None)
+                if decoded is None:
+                    decoded = pygame.image.load(path)
+                image = convert(decoded, mode)
+            else:
+                self.hits += 1
+                self._unused.discard(key)
+            entry = self._in_use[key] = [image, 0]
+            self.in_use_size += surface_bytes(image)
+            self._fit()
+        else:
+            self.hits += 1
+        entry[1] += 1
+        return entry[0]
+
+    def add_decoded(self, path, image):
+        """Add an image which has been loaded but not converted yet.
+
+        Images can be loaded before the display exists, but can't be
+        converted until afterwards. They are converted when first used, or
+        all at once by `convert_decoded`. They aren't counted against the
+        budget until `finish_preload` is called, so that they aren't
+        evicted before the widgets which will use them are built.
+
+        :param path: The path the image was loaded from.
+        :param image: The loaded image.
+
+        """
+        if (path, 'alpha') not in self._in_use:
+            self._decoded[path] = image
+
+    def convert_decoded(self, mode='alpha'):
+        """Convert all the images added with `add_decoded`.
+
+        This needs the display to exist.
+
+        :param mode: (Optional) How to convert the images, see `convert`.
+            Defaults to 'alpha'.
+
+        """
+        while self._decoded:
+            path, image = self._decoded.popitem()
+            key = (path, mode)
+            if key not in self._in_use and key not in self._unused:
+                self._converted[key] = convert(image, mode)
+
+    def finish_preload(self):
+        """Cache any preloaded images which haven't been used as unused.
+
+        Any which haven't been converted yet are dropped.
+
+        """
+        self._decoded.clear()
+        while self._converted:
+            key, image = self._converted.popitem()
+            self._unused.put(key, image)
+
+    def release(self, path, mode='alpha'):
+        """Stop using an image returned by `acquire`.
+
+        :param path: The path the image was acquired with.
+        :param mode: (Optional) The conversion mode it was acquired with.
+
+        """
+        key = (path, mode)
+        entry = self._in_use[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._in_use[key]
+            self.in_use_size -= surface_bytes(entry[0])
+            self._fit()
+            self._unused.put(key, entry[0])
+
+    def set_budget(self, budget):
+        """Change the budget, evicting unused images if it is exceeded.
+
+        :param budget: The most bytes of image data to keep.
+
+        """
+        self.budget = budget
+        self._fit()
+
+    def clear(self):
+        """Forget all the unused images, and reset the statistics."""
+        self._unused.clear()
+        self._decoded.clear()
+        self._converted.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Return a dict describing how the cache is performing."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self._unused.evictions,
+            'in_use': len(self._in_use),
+            'in_use_size': self.in_use_size,
+            'unused': len(self._unused),
+            'unused_size': self._unused.size,
+            'budget': self.budget
+        }
+
+    def _fit(self):
+        # Images in use can't be evicted, so unused ones get what's left.
+        self._unused.set_budget(max(0, self.budget - self.in_use_size))
+
+
+#: Images shared by all widgets. Use `cache.stats()` to see how well it
+#: is working, and `cache.set_budget()` to change the maximum number of
+#: bytes it may hold.
+cache = ImageCache(32 * 1024 * 1024)
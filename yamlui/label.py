@@ -15,7 +15,7 @@
 
 import pygame
 
-import yamlui
+from yamlui import binding
 from yamlui import fonts
 from yamlui.util import render_text_list
 from yamlui.util import wrap_text
@@ -124,9 +124,16 @@ class Label(Widget):
 
         self.state = 'idle'
         self.bound = False
+        self.polling = False
         self.old_content = None
         if 'content-bind' in self._properties:
             self.bound = True
+            self.polling = not binding.watch_binding(
+                self, self._properties['content-bind'])
+            if self.polling:
+                # Bound content which isn't observable is polled for
+                # changes.
+                self.request_updates()
 
         self.surface = create_label_surface(self)
         self.render_text()
@@ -136,8 +143,8 @@ class Label(Widget):
         font = fonts.make_font(self._properties.get('font', 'arial'),
                                self._properties.get('font-size', 12))
         if self.bound:
-            content = yamlui.get_callback(
-                self._properties['content-bind'], self)
+            content = self.resolve_callback(
+                self._properties['content-bind'])
             if callable(content):
                 content = content()
         else:
@@ -155,23 +162,45 @@ class Label(Widget):
         return True
 
     def redraw(self):
+        old_rect = self.surface.rect.copy()
         modified = self.render_text()
         if modified:
             self.surface.reset()
             self.surface.draw_text(self.rendered_text)
+            self.layout()
+            self.mark_dirty(old_rect.union(self.surface.rect))
+
+    def set_text(self, text):
+        """Change the text shown by the label.
+
+        :param text: The new text.
+
+        """
+        self._properties['text'] = text
+        old_rect = self.surface.rect.copy()
+        if not self.render_text():
+            return
+        if None in (self._properties.get('width'),
+                    self._properties.get('height')):
+            # The size depends on the text.
+            self.surface = create_label_surface(self, True)
+            self.surface.rect.topleft = old_rect.topleft
+        else:
+            self.surface.reset()
+        self.surface.draw_text(self.rendered_text)
+        self.rect_changed()
+        self.mark_dirty(old_rect.union(self.surface.rect))
+
+    def refresh_binding(self):
+        self.redraw()
 
     def update(self):
-        if self.bound:
+        if self.polling:
             self.redraw()
 
-    def set_relative_position(self):
-        x, y = self.parent.surface.rect.topleft
-        dx, dy = self._properties['position']
-        self.surface.rect.x = x + dx
-        self.surface.rect.y = y + dy
+    def collect_draw(self, surface, blits):
+        blits.append((self.surface, self.surface.rect))
 
     def draw(self, surface):
-        """Draw the container and its contents on the given surface."""
-        if self._properties.get('display') == 'relative' and self.parent:
-            self.set_relative_position()
+        """Draw the label on the given surface."""
         self.surface.draw(surface)
@@ -0,0 +1,243 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pygame
+
+import yamlui
+from yamlui import binding
+from yamlui.container import ContainerSurface
+from yamlui.util import create_surface
+from yamlui.util import flush_blits
+from yamlui.widget import Widget
+
+
+def _numbered(definition, number):
+    """Return a copy of a row definition with its names made unique.
+
+    Each name is suffixed with the number of the row, so the rows can be
+    added to the tree without their names clashing.
+
+    :param definition: The definition of a row or one of its children.
+    :param number: The number of the row.
+
+    """
+    definition = dict(definition)
+    properties = dict(definition.get('properties', {}))
+    if 'name' in properties:
+        properties['name'] = '%s-%d' % (properties['name'], number)
+    definition['properties'] = properties
+    if 'children' in definition:
+        definition['children'] = [_numbered(child, number)
+                                  for child in definition['children']]
+    return definition
+
+
+class ListView(Widget):
+
+    """A scrolling list of rows showing the items in a sequence.
+
+    Only enough row widgets to fill the list are created, from the `row`
+    definition, and they are reused to show different items as the list
+    scrolls. Each row shows the text given by formatting its item with
+    `row-format`, so rows need a `set_text` method, as labels have. Rows
+    are positioned by the list, so their definition shouldn't give them a
+    position. Any names given in the row definition are suffixed with the
+    number of the row, for example `name-0`, since each row is a separate
+    widget.
+
+    The items come from the object or callback given by `content-bind`,
+    which may be a sequence or a method returning one, or from the `items`
+    property.
+
+    Example yaml definition::
+
+        - object: list
+          properties:
+            position: [10, 10]
+            width: 200
+            height: 300
+            colour: [0, 0, 0]
+            content-bind: villagers
+            row-height: 20
+            row-format: '{0.name}'
+          row:
+            object: label
+            properties:
+              width: 200
+              height: 20
+              font-size: 14
+
+    """
+
+    def __init__(self, definition, style={}, parent=None):
+        super(ListView, self).__init__(definition, style=style, parent=parent)
+
+        self.state = 'idle'
+        self.surface = create_surface(self, ContainerSurface)
+        self.row_height = self._properties.get('row-height', 20)
+        self.row_format = self._properties.get('row-format', '{}')
+        self.scroll_step = self._properties.get('scroll-rows', 3)
+        self.offset = 0
+        self.items = []
+
+        self.bound = 'content-bind' in self._properties
+        self.polling = False
+        if self.bound:
+            self.polling = not binding.watch_binding(
+                self, self._properties['content-bind'])
+            if self.polling:
+                # Bound items which aren't observable are polled for
+                # changes.
+                self.request_updates()
+
+        row_definition = dict(definition.get('row', {'object': 'label'}))
+        # Rows start empty, their text is set when they are given an item.
+        row_definition['properties'] = dict(
+            row_definition.get('properties', {}), text='')
+        row_class = yamlui.class_mapping.get(row_definition['object'])
+        if row_class is None:
+            raise Exception('No class found for %s' %
+                            row_definition['object'])
+        # One more row than fits, since the top and bottom rows can both
+        # be partly visible.
+        count = -(-self.surface.rect.height // self.row_height) + 1
+        self.children = [
+            row_class(_numbered(row_definition, number), style=style,
+                      parent=self)
+            for number in range(count)]
+        self.refresh()
+
+    @property
+    def first(self):
+        """The index of the item at the top of the list."""
+        return self.offset // self.row_height
+
+    def get_items(self):
+        """Return the sequence of items to show."""
+        if not self.bound:
+            return self._properties.get('items', [])
+        items = self.resolve_callback(self._properties['content-bind'])
+        if callable(items):
+            items = items()
+        return items
+
+    def scroll_to(self, offset):
+        """Scroll the list.
+
+        :param offset: The distance from the top of the first item to the
+            top of the list, in pixels. It is limited so that the list
+            never scrolls past its last item.
+
+        """
+        limit = len(self.items) * self.row_height - self.surface.rect.height
+        offset = max(0, min(offset, limit))
+        if offset != self.offset:
+            self.offset = offset
+            self.layout_children()
+            self.mark_dirty()
+
+    def refresh(self):
+        """Fetch the items again, and update the visible rows."""
+        old_count = len(self.items)
+        self.items = self.get_items()
+        # Clamp the scroll position, in case items were removed.
+        self.scroll_to(self.offset)
+        self.layout_children()
+        if len(self.items) != old_count:
+            self.mark_dirty()
+
+    def layout_children(self):
+        """Position the rows, and give them the items they should show.
+
+        The row showing item `n` is always `children[n % len(children)]`,
+        so after scrolling only the rows which come into view need to
+        change their text. Rows past the end of the items are hidden, so
+        that they can't be clicked.
+
+        """
+        count = len(self.children)
+        x, y = self.surface.rect.topleft
+        for index in range(self.first, self.first + count):
+            row = self.children[index % count]
+            for surface in row.get_surfaces():
+                surface.rect.topleft = (
+                    x, y + index * self.row_height - self.offset)
+            row.visible = index < len(self.items)
+            if row.visible:
+                row.set_text(self.row_format.format(self.items[index]))
+            row.rect_changed()
+            row.layout_children()
+
+    def visible_rows(self):
+        """Return the rows which are showing an item, top to bottom."""
+        count = len(self.children)
+        last = min(self.first + count, len(self.items))
+        return [self.children[index % count]
+                for index in range(self.first, last)]
+
+    def compute_bounds(self):
+        if not self.visible:
+            return None
+        # Rows are clipped to the list.
+        return pygame.Rect(self.surface.rect)
+
+    def child_clip(self):
+        return self.surface.rect
+
+    def handle_own_event(self, event):
+        if not self.surface.rect.collidepoint(pygame.mouse.get_pos()):
+            return False
+        if event.type == getattr(pygame, 'MOUSEWHEEL', None):
+            direction = -event.y
+        elif (not hasattr(pygame, 'MOUSEWHEEL') and
+                event.type == pygame.MOUSEBUTTONDOWN and
+                event.button in (4, 5)):
+            direction = -1 if event.button == 4 else 1
+        else:
+            return False
+        self.scroll_to(
+            self.offset + direction * self.scroll_step * self.row_height)
+        return True
+
+    def handle_event(self, event):
+        """Handle an event."""
+        for row in self.visible_rows():
+            handled = row.handle_event(event)
+            if handled:
+                return handled
+        return self.handle_own_event(event)
+
+    def refresh_binding(self):
+        self.refresh()
+
+    def update(self):
+        if self.polling:
+            self.refresh()
+
+    def collect_draw(self, surface, blits):
+        blits.append((self.surface, self.surface.rect))
+        flush_blits(surface, blits)
+        old_clip = surface.get_clip()
+        surface.set_clip(old_clip.clip(self.surface.rect))
+        for row in self.visible_rows():
+            row.collect_draw(surface, blits)
+        flush_blits(surface, blits)
+        surface.set_clip(old_clip)
+
+    def draw(self, surface):
+        """Draw the list and its visible rows on the given surface."""
+        blits = []
+        self.collect_draw(surface, blits)
+        flush_blits(surface, blits)
@@ -0,0 +1,234 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Loading of UI definitions, with an on-disk cache of parsed results.
+
+Parsing YAML is slow, so the parsed definition and the merged style dict
+built from its includes are pickled into a cache directory. The cached
+copy is used for as long as neither the definition nor any of its includes
+have changed.
+
+The cache can be filled in advance, for example at deploy time, by running
+``python -m yamlui warm path/to/ui.yaml ...``.
+
+"""
+
+import hashlib
+import os
+import tempfile
+
+import six
+from six.moves import cPickle as pickle
+import yaml
+
+
+# Use the libyaml based loader if PyYAML was built with it.
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Bump this whenever the format of the cached data changes.
+CACHE_VERSION = 1
+
+
+def default_cache_dir():
+    """Return the directory to store compiled definitions in.
+
+    This is `$YAMLUI_CACHE_DIR` if it is set, otherwise a `yamlui`
+    directory in the user's cache directory.
+
+    """
+    if os.environ.get('YAMLUI_CACHE_DIR'):
+        return os.environ['YAMLUI_CACHE_DIR']
+    base = os.environ.get('XDG_CACHE_HOME',
+                          os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'yamlui')
+
+
+def _digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _load_source(path):
+    """Parse a YAML file, and record what it looked like when read.
+
+    The file is stat'd before it is read, so if it changes while being
+    read the recorded mtime will be out of date rather than the hash.
+
+    :param path: The path to the file to parse.
+    :returns: A tuple of the parsed content and a dict describing the file.
+
+    """
+    stat = os.stat(path)
+    with open(path, 'rb') as source:
+        data = source.read()
+    info = {
+        'path': os.path.abspath(path),
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'sha1': _digest(data)
+    }
+    return yaml.load(data, Loader=Loader), info
+
+
+def _is_current(info):
+    """Check whether a source file is unchanged since it was cached.
+
+    If the file was touched without its content changing, `info` is
+    updated with its new mtime, so that it isn't hashed again next time.
+
+    """
+    try:
+        stat = os.stat(info['path'])
+    except OSError:
+        return False
+    if stat.st_mtime == info['mtime'] and stat.st_size == info['size']:
+        return True
+    # The file was touched, but its content may still be the same.
+    with open(info['path'], 'rb') as source:
+        if _digest(source.read()) != info['sha1']:
+            return False
+    info['mtime'] = stat.st_mtime
+    info['size'] = stat.st_size
+    return True
+
+
+def compile_definition(path):
+    """Parse a UI definition and merge the styles from its includes.
+
+    :param path: The path to the YAML UI definition.
+    :returns: A tuple of the parsed definition, the merged style dict,
+        and a list of dicts describing each of the files which were read.
+
+    """
+    ui, info = _load_source(path)
+    sources = [info]
+
+    full_style = {}
+    for style_path in ui.get('include', []):
+        style, info = _load_source(style_path)
+        sources.append(info)
+        for definition in style:
+            full_style[definition['name']] = definition['properties']
+
+    return ui, full_style, sources
+
+
+def cache_path(path, cache_dir=None):
+    """Return the path of the cache file for a UI definition.
+
+    Includes are found relative to the working directory, so this depends
+    on the working directory as well as the path to the definition.
+
+    :param path: The path to the YAML UI definition.
+    :param cache_dir: (Optional) The cache directory to use.
+
+    """
+    key = '%s\0%s' % (os.path.abspath(path), os.getcwd())
+    name = hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pickle'
+    return os.path.join(cache_dir or default_cache_dir(), name)
+
+
+def _read_cache(filename):
+    try:
+        with open(filename, 'rb') as cache_file:
+            cached = pickle.load(cache_file)
+    except Exception:
+        return None
+    if not isinstance(cached, dict):
+        return None
+    if cached.get('version') != CACHE_VERSION:
+        return None
+    mtimes = [info['mtime'] for info in cached['sources']]
+    if not all(_is_current(info) for info in cached['sources']):
+        return None
+    if mtimes != [info['mtime'] for info in cached['sources']]:
+        # Remember the new mtimes of files which were only touched.
+        _write_cache(filename, cached)
+    return cached
+
+
+def write_atomically(filename, data):
+    """Write a file in the cache, so that readers never see part of it.
+
+    :param filename: The path of the file to write.
+    :param data: The bytes to write.
+    :returns: True if the file was written, False if it couldn't be.
+
+    """
+    directory = os.path.dirname(filename)
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as cache_file:
+            cache_file.write(data)
+        if six.PY2 and os.path.exists(filename):
+            os.remove(filename)
+        os.rename(temp, filename)
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def _write_cache(filename, cached):
+    # Failing to cache isn't fatal, the definition will just be parsed
+    # again next time.
+    return write_atomically(
+        filename, pickle.dumps(cached, pickle.HIGHEST_PROTOCOL))
+
+
+def load_definition(path, cache=True, cache_dir=None):
+    """Load a UI definition and the merged styles from its includes.
+
+    :param path: The path to the YAML UI definition.
+    :param cache: (Optional) Whether to use the on-disk cache. Defaults
+        to True.
+    :param cache_dir: (Optional) The cache directory to use. Defaults to
+        the result of `default_cache_dir()`.
+    :returns: A tuple of the parsed definition and the merged style dict.
+
+    """
+    if not cache:
+        ui, full_style, _ = compile_definition(path)
+        return ui, full_style
+
+    filename = cache_path(path, cache_dir)
+    cached = _read_cache(filename)
+    if cached is None:
+        ui, full_style, sources = compile_definition(path)
+        cached = {
+            'version': CACHE_VERSION,
+            'sources': sources,
+            'definition': ui,
+            'style': full_style
+        }
+        _write_cache(filename, cached)
+        return ui, full_style
+    return cached['definition'], cached['style']
+
+
+def warm(paths, cache_dir=None):
+    """Make sure the cache is up to date for some UI definitions.
+
+    :param paths: The paths of the YAML UI definitions to cache.
+    :param cache_dir: (Optional) The cache directory to use.
+    :returns: A list of the cache files for the given definitions.
+
+    """
+    filenames = []
+    for path in paths:
+        load_definition(path, cache_dir=cache_dir)
+        filenames.append(cache_path(path, cache_dir))
+    return filenames
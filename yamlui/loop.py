@@ -0,0 +1,249 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""A main loop for running a UI.
+
+Example usage::
+
+    import pygame
+    import yamlui
+
+    pygame.init()
+    window = yamlui.generate_ui('examples/minimal.yaml')
+    yamlui.run(window, fps=60)
+
+"""
+
+import timeit
+
+import pygame
+
+
+# The most updates to run in one frame when catching up after a slow frame.
+MAX_UPDATES_PER_FRAME = 5
+
+
+class EventPump(object):
+
+    """Gives events to the root widget of a UI, skipping redundant ones.
+
+    Runs of consecutive MOUSEMOTION events are combined into one, with the
+    final position and the total relative movement, since only where the
+    mouse ended up matters. Repeats of a KEYDOWN event are dropped while
+    nothing has the focus, if the first one wasn't handled, since they
+    would do nothing either.
+
+    `raw` counts the events given to `pump`, and `dispatched` counts the
+    ones which were passed on to the root widget.
+
+    """
+
+    def __init__(self, root):
+        """Initialise the event pump.
+
+        :param root: The root widget of the UI, normally a Window.
+
+        """
+        self.root = root
+        self.raw = 0
+        self.dispatched = 0
+
+    def coalesce(self, events):
+        """Combine runs of consecutive MOUSEMOTION events.
+
+        :param events: A list of events.
+        :returns: A new list of events.
+
+        """
+        coalesced = []
+        motion = None
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                if motion is None:
+                    motion = event
+                else:
+                    attributes = dict(event.dict)
+                    attributes['rel'] = (motion.rel[0] + event.rel[0],
+                                         motion.rel[1] + event.rel[1])
+                    motion = pygame.event.Event(pygame.MOUSEMOTION,
+                                                attributes)
+                continue
+            if motion is not None:
+                coalesced.append(motion)
+                motion = None
+            coalesced.append(event)
+        if motion is not None:
+            coalesced.append(motion)
+        return coalesced
+
+    def _has_focus(self):
+        manager = getattr(self.root, 'focus_manager', None)
+        # Without a focus manager, assume something could use the keys.
+        return manager is None or manager.focused is not None
+
+    def pump(self, events=None):
+        """Give some events to the root widget.
+
+        :param events: (Optional) A list of events. Defaults to the events
+            waiting in pygame's queue.
+        :returns: The number of events given to the root widget.
+
+        """
+        if events is None:
+            events = pygame.event.get()
+        self.raw += len(events)
+        dispatched = 0
+        ignored_key = None
+        for event in self.coalesce(events):
+            if event.type == pygame.KEYDOWN:
+                key = (event.key, getattr(event, 'mod', 0),
+                       getattr(event, 'unicode', None))
+                if key == ignored_key and not self._has_focus():
+                    continue
+                ignored_key = None
+                if not self.root.handle_event(event):
+                    ignored_key = key
+            else:
+                if event.type == pygame.KEYUP:
+                    ignored_key = None
+                self.root.handle_event(event)
+            dispatched += 1
+        self.dispatched += dispatched
+        return dispatched
+
+
+class FrameStats(object):
+
+    """Timing statistics for the frames run by `run`.
+
+    Times are in milliseconds. `frame_time` only counts the time spent
+    handling events, updating and drawing, not time spent waiting.
+    `raw_events` counts the events received from pygame, and `events`
+    counts the ones left after `EventPump` removes redundant events.
+
+    """
+
+    def __init__(self):
+        self.frames = 0
+        self.updates = 0
+        self.events = 0
+        self.raw_events = 0
+        self.idle_waits = 0
+        self.frame_time = 0.0
+        self.average_frame_time = 0.0
+        self.max_frame_time = 0.0
+        self.fps = 0.0
+
+    def record(self, frame_time, fps):
+        """Record the timing of a frame.
+
+        :param frame_time: The time spent working on the frame.
+        :param fps: The current frame rate, as measured by the clock.
+
+        """
+        self.frames += 1
+        self.frame_time = frame_time
+        self.max_frame_time = max(self.max_frame_time, frame_time)
+        # Exponential moving average, so old frames are gradually forgotten.
+        self.average_frame_time += (frame_time - self.average_frame_time) / \
+            min(self.frames, 60)
+        self.fps = fps
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def run(root, fps=60, update_rate=None, idle=True, idle_timeout=1000,
+        stats=None, max_frames=None):
+    """Run a UI until it quits.
+
+    Each frame handles any pending events, updates the UI and draws it.
+    Updates happen at a fixed rate, regardless of how long frames take,
+    and frames are capped to `fps` per second.
+
+    Events are given to the root widget by an `EventPump`.
+
+    In idle mode, if the root widget reports that it is idle, the loop
+    blocks waiting for an event rather than drawing frames which wouldn't
+    change anything. If the root widget has a scheduler, as windows do,
+    the wait ends when its next timer is due.
+
+    :param root: The root widget of the UI, normally a Window.
+    :param fps: (Optional) The maximum number of frames per second.
+        Defaults to 60.
+    :param update_rate: (Optional) The number of times per second to call
+        the root widget's `update` method. Defaults to `fps`.
+    :param idle: (Optional) Whether to wait for events when the UI is idle.
+        Defaults to True.
+    :param idle_timeout: (Optional) The longest time to wait for an event
+        when idle, in milliseconds. Defaults to 1000.
+    :param stats: (Optional) A FrameStats to record timings in.
+    :param max_frames: (Optional) Stop after this many frames. By default
+        the loop runs until the UI quits.
+    :returns: The FrameStats the timings were recorded in.
+
+    """
+    stats = stats or FrameStats()
+    pump = EventPump(root)
+    step = 1000.0 / (update_rate or fps)
+    clock = pygame.time.Clock()
+    lag = step
+    previous = pygame.time.get_ticks()
+
+    while max_frames is None or stats.frames < max_frames:
+        events = []
+        if idle and root.is_idle():
+            timeout = idle_timeout
+            scheduler = getattr(root, 'scheduler', None)
+            if scheduler is not None:
+                until_next = scheduler.time_until_next()
+                if until_next is not None:
+                    timeout = min(timeout, until_next)
+            # Waiting with no timeout would block until the next event.
+            if timeout > 0:
+                event = pygame.event.wait(timeout)
+                stats.idle_waits += 1
+                if event.type != pygame.NOEVENT:
+                    events.append(event)
+            # Nothing was happening while waiting, so there is nothing to
+            # catch up on apart from a single update.
+            previous = pygame.time.get_ticks()
+            lag = step
+
+        start = timeit.default_timer()
+        events.extend(pygame.event.get())
+        stats.raw_events += len(events)
+        stats.events += pump.pump(events)
+
+        now = pygame.time.get_ticks()
+        lag += now - previous
+        previous = now
+        updates = 0
+        while lag >= step:
+            if updates == MAX_UPDATES_PER_FRAME:
+                lag = 0
+                break
+            root.update()
+            updates += 1
+            lag -= step
+        stats.updates += updates
+
+        root.draw()
+        stats.record((timeit.default_timer() - start) * 1000,
+                     clock.get_fps())
+        clock.tick(fps)
+
+    return stats
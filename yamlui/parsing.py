@@ -15,11 +15,97 @@
 
 import importlib
 import os
-import uuid
-
-import yaml
 
 import yamlui
+from yamlui import images
+from yamlui import loader
+from yamlui import preload as preloading
+from yamlui.tree import get_name
+from yamlui.tree import UITree
+from yamlui.widget import resolve_style
+from yamlui.widget import Stylesheet
+from yamlui.widget import Widget
+
+
+class LazyWidget(Widget):
+
+    """A placeholder for a hidden widget which hasn't been built yet.
+
+    In lazy mode, widgets which start hidden are replaced by one of these
+    when the tree is built, so that nothing is spent on their surfaces,
+    text or images until they are needed. The real widget and its
+    descendants are built when the placeholder is shown, or when it or
+    one of its descendants is looked up in `yamlui.trees`.
+
+    Lazy mode is enabled by the `lazy` argument to `generate_ui`, or by
+    setting the `lazy` property on a widget, and applies to all of the
+    widget's descendants.
+
+    """
+
+    def __init__(self, definition, style={}, parent=None):
+        # Any object binding happens when the real widget is built.
+        placeholder = dict(definition)
+        placeholder.pop('bind-object', None)
+        super(LazyWidget, self).__init__(placeholder, style=style,
+                                         parent=parent)
+        self.definition = definition
+        self.children = []
+
+    def collect_draw(self, surface, blits):
+        pass
+
+    def materialise(self):
+        """Build the real widget, and put it in the tree in place of this.
+
+        :returns: The real widget.
+
+        """
+        parent = self.parent
+        widget = create_widget(self.definition, self.stylesheet, parent)
+        parent.unindex_subtree(self)
+        siblings = parent.children
+        siblings[siblings.index(self)] = widget
+        widget.resolve_callbacks()
+        tree = getattr(self.root, 'ui_tree', None)
+        if tree is not None:
+            tree.replace(self, widget)
+
+        widget.layout()
+        parent.invalidate_bounds()
+        parent.index_subtree(widget)
+        return widget
+
+    def show(self):
+        return self.materialise().show()
+
+
+def starts_hidden(definition, style={}):
+    """Return whether the widget in a definition is initially hidden.
+
+    :param definition: The definition of the widget.
+    :param style: The stylesheet the widget will use.
+
+    """
+    properties = definition.get('properties', {})
+    if 'visible' in properties:
+        return not properties['visible']
+    resolved = resolve_style(style, definition.get('style', []))
+    return not resolved.get('visible', True)
+
+
+def create_widget(definition, style={}, parent=None):
+    """Create a widget and its descendants from a definition.
+
+    :param definition: The definition of the widget.
+    :param style: The stylesheet to use.
+    :param parent: The parent of the new widget.
+
+    """
+    widget_class = yamlui.class_mapping.get(definition['object'])
+    if widget_class is None:
+        raise Exception('No class found for %s' % definition['object'])
+    return widget_class(definition, style=style, parent=parent)
 
 
 def parse_children(definition, widget=None, style={}):
@@ -36,33 +122,27 @@ def parse_children(definition, widget=None, style={}):
     if child_defs is None:
         return []
 
+    lazy = getattr(widget, 'lazy', False)
     children = []
     for child_definition in child_defs:
-        child_class = yamlui.class_mapping.get(child_definition['object'])
-        if child_class is None:
-            raise Exception('No class found for %s' %
-                            child_definition['object'])
-        child = child_class(child_definition, style=style, parent=widget)
+        if lazy and starts_hidden(child_definition, style):
+            if child_definition['object'] not in yamlui.class_mapping:
+                raise Exception('No class found for %s' %
+                                child_definition['object'])
+            child = LazyWidget(child_definition, style=style, parent=widget)
+        else:
+            child = create_widget(child_definition, style, widget)
         children.append(child)
 
     return children
 
 
-def get_name(widget):
-    """Get a unique name for the widget.
-
-    If the widget's properties contain `name`, then use that. Otherwise
-    generate it a uuid.
-
-    :param widget: The widget to get a name for.
-
-    """
-    return widget._properties.get('name', uuid.uuid4())
-
-
 def build_dictionary(root, ui_name=None):
     """Build a dictionary containing the given widget and all its descendants.
 
+    The dictionary is a `UITree`, which also indexes the widgets by type
+    and style. It is kept up to date as widgets are added and removed.
+
     :param root: The root widget of the UI tree to build a dictionary for.
     :param ui_name: The name of this UI tree. If not given, the name of the
     root widget will be used.
@@ -72,25 +152,14 @@ def build_dictionary(root, ui_name=None):
     if name in yamlui.trees:
         raise Exception('Duplicate UI name')
 
-    def add_children(widget, ui_dict):
-        name = get_name(widget)
-        if name in ui_dict:
-            raise Exception('Duplicate widget name')
-
-        ui_dict[get_name(widget)] = widget
-        if not hasattr(widget, 'children'):
-            return
-        for child in widget.children:
-            add_children(child, ui_dict)
-
-    ui_dict = {get_name(root): root}
-    for widget in root.children:
-        add_children(widget, ui_dict)
-
+    ui_dict = UITree()
+    ui_dict.add(root)
+    root.ui_tree = ui_dict
     return ui_dict
 
 
-def generate_ui(path, modules=[]):
+def generate_ui(path, modules=[], cache=True, cache_dir=None, lazy=False,
+                preload=True):
     """Takes a path to a YAML UI definition, and generates a UI tree for it.
 
     :param definition: A UI definition representing the UI to be created.
@@ -98,27 +167,42 @@ def generate_ui(path, modules=[]):
         imported in order to generate the UI tree. This should include all
         module names which define custom widgets or callbacks using
         decorators that are used in the definition.
+    :param cache: (Optional) Whether to use the on-disk cache of parsed
+        definitions, see `yamlui.loader`. Defaults to True.
+    :param cache_dir: (Optional) The directory to cache parsed definitions
+        in. Defaults to `yamlui.loader.default_cache_dir()`.
+    :param lazy: (Optional) Whether to put off building widgets which
+        start hidden until they are needed, see `LazyWidget`. Defaults to
+        False, unless the root widget has the `lazy` property.
+    :param preload: (Optional) Whether to load the images and fonts used
+        by the definition in parallel before building the widgets, see
+        `yamlui.preload`. Defaults to True.
 
     """
     for module in modules:
         importlib.import_module(module)
 
-    with open(path, 'r') as ui_file:
-        ui = yaml.safe_load(ui_file)
-
-    full_style = {}
-    for style_path in ui.get('include', []):
-        with open(style_path, 'r') as style_file:
-            style = yaml.safe_load(style_file)
-        for definition in style:
-            full_style[definition['name']] = definition['properties']
+    ui, full_style = loader.load_definition(
+        path, cache=cache, cache_dir=cache_dir)
+    full_style = Stylesheet(full_style)
 
     definition = ui['definition']
+    if lazy:
+        definition = dict(definition)
+        definition['properties'] = dict(
+            definition.get('properties', {}), lazy=True)
     root_class = yamlui.class_mapping.get(definition['object'])
     if root_class is None:
         raise Exception('ERROR: Root class is an unrecognised widget type.')
+    if preload:
+        preloading.preload(definition, full_style)
 
     root = root_class(definition, style=full_style)
+    # Work out where the widgets are, now that the whole tree is built.
+    root.layout()
+    if preload:
+        images.cache.finish_preload()
+    root.resolve_callbacks()
     ui_name = os.path.basename(path)
     yamlui.trees[ui_name] = build_dictionary(root, ui_name)
 
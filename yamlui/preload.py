@@ -0,0 +1,133 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Loading the files a UI definition uses before building its widgets.
+
+Decoding images is slow, and pygame releases the GIL while doing it, so
+the images used by a definition are decoded in a pool of threads. The
+system font index is built at the same time, since looking it up for the
+first time can be slow too. Fonts are then opened one at a time, since
+the font renderer isn't thread safe.
+
+Decoded images can't be converted for the display until it exists, so
+they are handed to `yamlui.images.cache`, and the window converts them
+all at once after creating the display.
+
+"""
+
+import multiprocessing
+
+import pygame
+
+try:
+    from concurrent import futures
+except ImportError:
+    # Python 2 without the futures backport doesn't decode images early.
+    futures = None
+
+from yamlui import fonts
+from yamlui import images
+from yamlui.widget import resolve_style
+
+
+IMAGE_PROPERTIES = ('image', 'content-image')
+TEXT_PROPERTIES = ('text', 'content-bind', 'font', 'font-size')
+
+
+def _properties(definition, style):
+    properties = dict(resolve_style(style, definition.get('style', [])))
+    properties.update(definition.get('properties', {}))
+    return properties
+
+
+def scan(definition, style={}):
+    """Find the images and fonts used by a definition.
+
+    Hidden subtrees which won't be built straight away in lazy mode are
+    skipped.
+
+    :param definition: The definition of the root widget.
+    :param style: The stylesheet the widgets will use.
+    :returns: A tuple of a set of image paths and a set of (font name,
+        font size) tuples.
+
+    """
+    paths = set()
+    font_keys = set()
+    pending = [(definition, False)]
+    while pending:
+        current, lazy = pending.pop()
+        properties = _properties(current, style)
+        lazy = properties.get('lazy', lazy)
+        if lazy and not properties.get('visible', True):
+            continue
+        variants = [properties, properties.get('hover-effects') or {}]
+        for variant in variants:
+            for key in IMAGE_PROPERTIES:
+                if key in variant:
+                    paths.add(variant[key])
+        if (current.get('object') == 'textbox' or
+                any(key in properties for key in TEXT_PROPERTIES)):
+            font_keys.add((properties.get('font', 'arial'),
+                           properties.get('font-size', 12)))
+        pending.extend(
+            (child, lazy) for child in current.get('children', []))
+        if 'row' in current:
+            pending.append((current['row'], lazy))
+    return paths, font_keys
+
+
+def _decode(path):
+    try:
+        return pygame.image.load(path)
+    except (pygame.error, IOError):
+        # Leave the error to be reported when the widget is built.
+        return None
+
+
+def preload(definition, style={}, workers=None):
+    """Load the images and fonts used by a definition.
+
+    :param definition: The definition of the root widget.
+    :param style: The stylesheet the widgets will use.
+    :param workers: (Optional) The number of threads to decode images in.
+        Defaults to one per CPU, up to 8. With only one, decoding them
+        early gains nothing, so they are loaded as the widgets are built.
+
+    """
+    paths, font_keys = scan(definition, style)
+    paths = sorted(paths)
+    # Fonts which haven't been found before need a system font scan.
+    need_index = any(not fonts.is_indexed(name) for name, _ in font_keys)
+    if workers is None:
+        workers = min(8, multiprocessing.cpu_count())
+    workers = min(workers, len(paths) + need_index)
+
+    if futures is not None and workers > 1:
+        pool = futures.ThreadPoolExecutor(max_workers=workers)
+        with pool:
+            if need_index:
+                index = pool.submit(pygame.font.get_fonts)
+            decoded = list(pool.map(_decode, paths))
+            if need_index:
+                index.result()
+        for path, image in zip(paths, decoded):
+            if image is not None:
+                images.cache.add_decoded(path, image)
+        if pygame.display.get_surface() is not None:
+            images.cache.convert_decoded()
+
+    fonts.preload_fonts(sorted(font_keys))
@@ -0,0 +1,195 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pygame
+
+
+def _previous(widget):
+    """Return the widget walked just before a widget and its descendants."""
+    siblings = widget.parent.children
+    position = siblings.index(widget)
+    if position == 0:
+        return widget.parent
+    previous = siblings[position - 1]
+    while getattr(previous, 'children', None):
+        previous = previous.children[-1]
+    return previous
+
+
+def _following(widget):
+    """Return the widget walked just after a widget and its descendants."""
+    while widget.parent is not None:
+        siblings = widget.parent.children
+        position = siblings.index(widget)
+        if position + 1 < len(siblings):
+            return siblings[position + 1]
+        widget = widget.parent
+    return None
+
+
+class SpatialIndex(object):
+
+    """An index of the on-screen rects of the widgets in a UI tree.
+
+    The screen is divided into a uniform grid of square cells, and each
+    cell records the widgets whose rects overlap it. Finding the widgets
+    at a point then only needs to check the widgets in one cell.
+
+    Widgets are ordered by their position in a pre-order walk of the tree,
+    which is the order they are drawn in. Later widgets are on top. Widgets
+    added to the tree are numbered between their neighbours in the walk, so
+    the rest of the tree keeps its numbers.
+
+    `version` is increased whenever the index changes, so that results
+    calculated from it can be reused until then.
+
+    """
+
+    def __init__(self, cell_size=64):
+        """Initialise the index.
+
+        :param cell_size: The width and height of each grid cell.
+
+        """
+        self.cell_size = cell_size
+        self.version = 0
+        self._cells = {}
+        self._rects = {}
+        self._order = {}
+
+    def _cells_for(self, rect):
+        size = self.cell_size
+        for x in range(rect.left // size, (rect.right - 1) // size + 1):
+            for y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield (x, y)
+
+    def rebuild(self, root):
+        """Index every widget in a tree.
+
+        :param root: The root widget of the tree. The root itself isn't
+            indexed, only its descendants.
+
+        """
+        self._cells.clear()
+        self._rects.clear()
+        self._order.clear()
+        self.version += 1
+        for order, widget in enumerate(root.walk()):
+            if widget is root:
+                continue
+            self._order[widget] = order
+            self.update(widget)
+
+    def insert_tree(self, widget):
+        """Index a widget and its descendants after they join the tree.
+
+        If there isn't room to number them between the widgets before and
+        after them, the whole tree is indexed again.
+
+        :param widget: The widget which was added. Its parent must already
+            be in the tree.
+
+        """
+        widgets = list(widget.walk())
+        # The root isn't indexed, it is always first.
+        first = self._order.get(_previous(widget), 0)
+        following = _following(widget)
+        if following is None:
+            last = first + len(widgets) + 1
+        else:
+            last = self._order[following]
+        step = (last - first) / float(len(widgets) + 1)
+        if step < 1e-6:
+            self.rebuild(widget.root)
+            return
+        for number, descendant in enumerate(widgets, 1):
+            self._order[descendant] = first + number * step
+            self.update(descendant)
+        self.version += 1
+
+    def update(self, widget):
+        """Update the index after a widget has moved or changed size.
+
+        :param widget: The widget which changed.
+
+        """
+        if widget not in self._order:
+            return
+        rect = widget.hit_rect()
+        old_rect = self._rects.get(widget)
+        if rect == old_rect:
+            return
+
+        self.version += 1
+        if old_rect is not None:
+            for cell in self._cells_for(old_rect):
+                self._cells[cell].discard(widget)
+            del self._rects[widget]
+        if rect is None or rect.width <= 0 or rect.height <= 0:
+            return
+        rect = pygame.Rect(rect)
+        self._rects[widget] = rect
+        for cell in self._cells_for(rect):
+            self._cells.setdefault(cell, set()).add(widget)
+
+    def remove(self, widget):
+        """Remove a widget from the index.
+
+        :param widget: The widget to remove.
+
+        """
+        self.version += 1
+        rect = self._rects.pop(widget, None)
+        if rect is not None:
+            for cell in self._cells_for(rect):
+                self._cells[cell].discard(widget)
+        self._order.pop(widget, None)
+
+    def remove_tree(self, widget):
+        """Remove a widget and its descendants from the index.
+
+        :param widget: The widget which is leaving the tree.
+
+        """
+        for descendant in widget.walk():
+            self.remove(descendant)
+
+    def order(self, widget):
+        """Return a number giving a widget's position in the walk order.
+
+        :param widget: An indexed widget.
+
+        """
+        return self._order[widget]
+
+    def at(self, point):
+        """Return the widgets whose rects contain a point, topmost first.
+
+        :param point: The (x, y) screen position to look at.
+
+        """
+        size = self.cell_size
+        cell = self._cells.get((point[0] // size, point[1] // size), ())
+        hits = [widget for widget in cell
+                if self._rects[widget].collidepoint(point)]
+        return self.sorted(hits)
+
+    def sorted(self, widgets):
+        """Sort some indexed widgets so that the topmost is first.
+
+        :param widgets: The widgets to sort.
+
+        """
+        return sorted(widgets, key=self._order.__getitem__, reverse=True)
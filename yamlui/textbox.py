@@ -17,12 +17,17 @@ import string
 
 import pygame
 
-import yamlui
 from yamlui import fonts
 from yamlui import util
+from yamlui.editing import GapBuffer
+from yamlui.widget import MOUSE_EVENTS
 from yamlui.widget import Widget
 
 
+#: How often the cursor blinks, in milliseconds.
+BLINK_INTERVAL = 750
+
+
 class TextBoxSurface(pygame.Surface):
 
     """The Surface used to represent the text box on screen."""
@@ -46,7 +51,8 @@ class TextBoxSurface(pygame.Surface):
 
         """
         y = (self.rect.height - content.get_height()) / 2
-        self.blit(content, (5, y))
+        area = pygame.Rect(0, 0, self.rect.width - 10, content.get_height())
+        self.blit(content, (5, y), area)
 
     def redraw(self, content=None):
         """Redraw the original image."""
@@ -69,7 +75,10 @@ class TextBox(Widget):
     """A text box widget.
 
     This text box can contain an arbitrary string of text which is input
-    by the user.
+    by the user. The text is kept in a `yamlui.editing.GapBuffer`, and
+    scrolls horizontally to keep the cursor in view. Only the part of the
+    text which is in view is measured or rendered, so editing takes the
+    same time however long the text gets.
 
     Example yaml definition::
 
@@ -88,29 +97,41 @@ class TextBox(Widget):
 
     """
 
+    focusable = True
+
     def __init__(self, definition, style={}, parent=None):
         super(TextBox, self).__init__(definition, style=style, parent=parent)
 
         self.state = 'idle'
         self.bound = False
         self.old_content = None
-        self.content = ''
+        content = ''
         if 'content-bind' in self._properties:
             self.bound = 'one-way'
-            self.bound_content = yamlui.get_callback(
-                self._properties['content-bind'], self)
+            self.bound_content = self.resolve_callback(
+                self._properties['content-bind'])
             if callable(self.bound_content):
-                self.content = self.bound_content()
+                content = self.bound_content()
             else:
-                self.content = self.bound_content
+                content = self.bound_content
                 self.bound = 'two-way'
+        self.buffer = GapBuffer(content or '')
+        self.scroll = 0
+        self.cursor_x = 0
+        self.stale = False
+        self.font = fonts.make_font(self._properties.get('font', 'arial'),
+                                    self._properties.get('font-size', 12))
+        self.font_colour = self._properties.get('font-colour',
+            self._properties.get('font-color', (0, 0, 0)))
+        self._char_widths = {}
 
         self.focus = False
+        self.hovered = False
+        self.mouse_over = False
         self.valid = string.ascii_letters + string.digits + \
                      string.punctuation + ' '
-        self.timer = 0
         self.blink = False
-        self.rendered = self.render_text()
+        self.blink_timer = None
 
         self.surface = util.create_surface(self, TextBoxSurface)
         self.hover_surface = util.create_surface(
@@ -119,8 +140,26 @@ class TextBox(Widget):
         self.focus_surface = util.create_surface(
             self, TextBoxSurface,
             properties=self._properties.get('focus-effects'))
+        # Space is left on each side of the text, see `draw_content`.
+        self.text_width = max(0, self.surface.rect.width - 10)
+        self.scroll_to_cursor()
+        self.rendered = self.render_text()
         self.redraw_text()
 
+    @property
+    def content(self):
+        """The text in the text box."""
+        return self.buffer.text()
+
+    @content.setter
+    def content(self, text):
+        self.buffer.set_text(text)
+        self.scroll = 0
+        self.scroll_to_cursor()
+        self.rendered = self.render_text()
+        self.redraw_text()
+        self.mark_dirty()
+
     def _collide(self, point):
         return self.surface.rect.collidepoint(point)
 
@@ -128,30 +167,123 @@ class TextBox(Widget):
         self.surface.redraw(self.rendered)
         self.hover_surface.redraw(self.rendered)
         self.focus_surface.redraw(self.rendered)
+        self.stale = False
 
-    def handle_input(self, event):
-        if event.unicode in self.valid:
-            self.content += event.unicode
-            if self.bound == 'two-way':
-                yamlui.two_way_callback(
-                    self._properties['content-bind'], self,
-                    'set', self.content)
-            self.rendered = self.render_text()
-        elif event.key == pygame.K_BACKSPACE:
-            self.content = self.content[:-1]
-            if self.bound == 'two-way':
-                yamlui.two_way_callback(
-                    self._properties['content-bind'], self,
-                    'set', self.content)
+    def char_width(self, char):
+        """Return the width of a character in the text box's font."""
+        width = self._char_widths.get(char)
+        if width is None:
+            width = self._char_widths[char] = self.font.size(char)[0]
+        return width
+
+    def scroll_to_cursor(self):
+        """Scroll the text so that the cursor is in view.
+
+        The text is scrolled as little as possible, except that it is
+        scrolled back to fill the box if there is space after the end of
+        the text. This also updates `cursor_x`.
+
+        """
+        buffer = self.buffer
+        cursor = buffer.cursor
+        # Leave room to draw the cursor after the last character.
+        limit = self.text_width - 2
+        if cursor < self.scroll:
+            self.scroll = cursor
+
+        start = cursor
+        width = 0
+        while start > self.scroll:
+            char_width = self.char_width(buffer[start - 1])
+            if width + char_width > limit:
+                self.scroll = start
+                break
+            start -= 1
+            width += char_width
+
+        if self.scroll > 0:
+            end = cursor
+            used = width
+            while end < len(buffer) and used <= limit:
+                used += self.char_width(buffer[end])
+                end += 1
+            while self.scroll > 0:
+                char_width = self.char_width(buffer[self.scroll - 1])
+                if used + char_width > limit:
+                    break
+                self.scroll -= 1
+                used += char_width
+                width += char_width
+        self.cursor_x = width
+
+    def visible_text(self):
+        """Return the part of the text which is in view."""
+        buffer = self.buffer
+        end = self.scroll
+        width = 0
+        while end < len(buffer) and width <= self.text_width:
+            width += self.char_width(buffer[end])
+            end += 1
+        return buffer.text(self.scroll, end)
+
+    def edited(self, changed=True):
+        """Update the text box after the text or the cursor has changed.
+
+        Only the focused look is redrawn, since the text box has the focus
+        while it is being edited. The others are redrawn when it loses the
+        focus.
+
+        :param changed: (Optional) Whether the text changed, rather than
+            just the cursor. Defaults to True.
+
+        """
+        scroll = self.scroll
+        self.scroll_to_cursor()
+        if changed or self.scroll != scroll:
             self.rendered = self.render_text()
+        if changed and self.bound == 'two-way':
+            self.set_binding(self._properties['content-bind'], self.content)
+        self.restart_blink()
+        self.focus_surface.redraw(self.rendered)
+        self.stale = True
+        self.mark_dirty()
+
+    def handle_input(self, event):
+        buffer = self.buffer
+        if event.key == pygame.K_BACKSPACE:
             self.state = 'deleting'
+            if buffer.delete_before():
+                self.edited()
+        elif event.key == pygame.K_DELETE:
+            if buffer.delete_after():
+                self.edited()
+        elif event.key == pygame.K_LEFT:
+            buffer.move_to(buffer.cursor - 1)
+            self.edited(changed=False)
+        elif event.key == pygame.K_RIGHT:
+            buffer.move_to(buffer.cursor + 1)
+            self.edited(changed=False)
+        elif event.key == pygame.K_HOME:
+            buffer.move_to(0)
+            self.edited(changed=False)
+        elif event.key == pygame.K_END:
+            buffer.move_to(len(buffer))
+            self.edited(changed=False)
         elif event.key == pygame.K_ESCAPE:
-            self.state = 'idle'
-            self.focus = False
-        self.redraw_text()
+            self.release_focus()
+        elif event.unicode and event.unicode in self.valid:
+            buffer.insert(event.unicode)
+            self.edited()
 
     def handle_event(self, event):
         """Handle an event."""
+        handled = self._handle_event(event)
+        if event.type in MOUSE_EVENTS:
+            # Clicking or releasing the text box can change its look.
+            self.update_hover()
+        return handled
+
+    def _handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
             if self.state == 'idle':
                 if not self._collide(pygame.mouse.get_pos()):
@@ -165,11 +297,10 @@ class TextBox(Widget):
         elif event.type == pygame.MOUSEBUTTONUP:
             if not self._collide(pygame.mouse.get_pos()):
                 self.state = 'idle'
-                self.focus = False
+                self.release_focus()
                 return False
             if self.state == 'click':
-                self.state = 'focused'
-                self.focus = True
+                self.request_focus()
                 return False
             elif self.state == 'focused':
                 return True
@@ -184,51 +315,92 @@ class TextBox(Widget):
             return False
         return False
 
-    def render_text(self):
-        font = fonts.make_font(self._properties.get('font', 'arial'),
-                               self._properties.get('font-size', 12))
-        colour = self._properties.get('font-colour',
-            self._properties.get('font-color', (0, 0, 0)))
-        return util.render_text_list([self.content], font, colour)
-
-    def update(self):
-        if pygame.time.get_ticks() - self.timer > 750:
-            self.blink = not self.blink
-            self.timer = pygame.time.get_ticks()
-            self.focus_surface.redraw(self.rendered)
-
-    def set_relative_position(self):
-        x, y = self.parent.surface.rect.topleft
-        dx, dy = self._properties['position']
-        self.surface.rect.x = x + dx
-        self.surface.rect.y = y + dy
-        self.hover_surface.rect.x = x + dx
-        self.hover_surface.rect.y = y + dy
-        self.focus_surface.rect.x = x + dx
-        self.focus_surface.rect.y = y + dy
+    def restart_blink(self):
+        """Show the cursor, and start blinking it again from now."""
+        if self.blink_timer is not None:
+            self.blink_timer.cancel()
+        self.blink = True
+        self.blink_timer = self.schedule(BLINK_INTERVAL, self.toggle_blink,
+                                         repeat=True)
+
+    def toggle_blink(self):
+        """Show or hide the cursor."""
+        self.blink = not self.blink
+        self.focus_surface.redraw(self.rendered)
+        self.mark_dirty()
 
-    def draw(self, surface):
-        """Draw the button onto the given surface.
+    def focus_gained(self):
+        self.state = 'focused'
+        self.focus = True
+        # Only the focused text box has a cursor to blink.
+        self.restart_blink()
+        self.mark_dirty()
 
-        :param surface: The surface to draw on.
+    def focus_lost(self):
+        self.state = 'idle'
+        self.focus = False
+        if self.blink_timer is not None:
+            self.blink_timer.cancel()
+            self.blink_timer = None
+        self.blink = False
+        if self.stale:
+            self.redraw_text()
+        self.mark_dirty()
 
-        """
-        if self._properties.get('display') == 'relative' and self.parent:
-            self.set_relative_position()
+    def captures_mouse(self):
+        return self.state != 'idle' or self.focus
 
+    def render_text(self):
+        """Render the part of the text which is in view, or return None."""
+        text = self.visible_text()
+        if not text:
+            return None
+        # Not cached like labels' text, since almost every edit gives a
+        # different string.
+        return self.font.render(text, True, self.font_colour).convert_alpha()
+
+    def hover_entered(self):
+        self.mouse_over = True
+        self.update_hover()
+
+    def hover_left(self):
+        self.mouse_over = False
+        self.update_hover()
+
+    def update_hover(self):
+        """Track whether the text box should be drawn in its hover state."""
+        hovered = self.mouse_over or self.state == 'click'
+        if hovered != self.hovered:
+            self.hovered = hovered
+            if not self.focus:
+                self.mark_dirty()
+
+    def get_surfaces(self):
+        return [self.surface, self.hover_surface, self.focus_surface]
+
+    def current_surface(self):
+        """Return the surface to show, drawing the cursor if focused."""
         if self.focus:
-            self.focus_surface.draw(surface)
-            colour = self._properties.get('font-colour',
-                self._properties.get('font-color', (0, 0, 0)))
             if self.blink:
                 if self.rendered is None:
-                    self.focus_surface.fill(colour,
+                    self.focus_surface.fill(self.font_colour,
                         (7, 5, 1, self.focus_surface.get_height() - 10))
                 else:
-                    self.focus_surface.fill(colour,
-                        (self.rendered.get_rect().right + 7, 5, 1,
+                    self.focus_surface.fill(self.font_colour,
+                        (self.cursor_x + 7, 5, 1,
                          self.rendered.get_rect().height))
-        elif self._collide(pygame.mouse.get_pos()) or self.state == 'click':
-            self.hover_surface.draw(surface)
-        else:
-            self.surface.draw(surface)
+            return self.focus_surface
+        elif self.hovered:
+            return self.hover_surface
+        return self.surface
+
+    def collect_draw(self, surface, blits):
+        blits.append((self.current_surface(), self.surface.rect))
+
+    def draw(self, surface):
+        """Draw the text box onto the given surface.
+
+        :param surface: The surface to draw on.
+
+        """
+        self.current_surface().draw(surface)
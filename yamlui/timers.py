@@ -0,0 +1,138 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import heapq
+import itertools
+
+import pygame
+
+
+class Timer(object):
+
+    """A callback scheduled to run at some time, see `Scheduler`."""
+
+    def __init__(self, deadline, callback, interval=None):
+        self.deadline = deadline
+        self.callback = callback
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the timer from firing."""
+        self.cancelled = True
+
+
+class Scheduler(object):
+
+    """Callbacks to run at given times, such as blinking a cursor.
+
+    Timers are kept in a heap ordered by their deadlines, so checking for
+    due timers only looks at the ones which are due. Times are in
+    milliseconds, as given by `pygame.time.get_ticks`.
+
+    Each Window has a scheduler, which is run whenever the window updates.
+    `yamlui.run` waits until the next deadline when the UI is idle.
+
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._order = itertools.count()
+
+    def __len__(self):
+        return sum(1 for _, _, timer in self._heap if not timer.cancelled)
+
+    def schedule(self, delay, callback, repeat=False):
+        """Run a callback after a delay.
+
+        :param delay: How long to wait before running the callback, in
+            milliseconds.
+        :param callback: The function to call. It is given no arguments.
+        :param repeat: (Optional) Whether to keep running the callback
+            every `delay` milliseconds until the timer is cancelled.
+            Defaults to False.
+        :returns: A Timer, which can be cancelled.
+
+        """
+        timer = Timer(pygame.time.get_ticks() + delay, callback,
+                      delay if repeat else None)
+        self._push(timer)
+        return timer
+
+    def _push(self, timer):
+        # The counter keeps timers with the same deadline in the order
+        # they were scheduled, and stops timers themselves being compared.
+        heapq.heappush(self._heap,
+                       (timer.deadline, next(self._order), timer))
+
+    def _discard_cancelled(self):
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+
+    def next_deadline(self):
+        """Return when the next timer is due, or None if there are none."""
+        self._discard_cancelled()
+        if self._heap:
+            return self._heap[0][0]
+        return None
+
+    def time_until_next(self, now=None):
+        """Return how many milliseconds until the next timer is due.
+
+        :param now: (Optional) The current time. Defaults to
+            `pygame.time.get_ticks()`.
+        :returns: The time, which is 0 if a timer is overdue, or None if
+            there are no timers.
+
+        """
+        deadline = self.next_deadline()
+        if deadline is None:
+            return None
+        if now is None:
+            now = pygame.time.get_ticks()
+        return max(0, deadline - now)
+
+    def run_due(self, now=None):
+        """Run the callbacks of the timers which are due.
+
+        :param now: (Optional) The current time. Defaults to
+            `pygame.time.get_ticks()`.
+        :returns: The number of callbacks which were run.
+
+        """
+        if now is None:
+            now = pygame.time.get_ticks()
+        fired = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+            if timer.interval is not None:
+                # Deadlines stay on the original schedule, but don't pile
+                # up if the timer is running late.
+                timer.deadline = max(timer.deadline + timer.interval,
+                                     now + 1)
+                self._push(timer)
+            else:
+                timer.cancel()
+            timer.callback()
+            fired += 1
+        return fired
+
+    def clear(self):
+        """Cancel all of the timers."""
+        for _, _, timer in self._heap:
+            timer.cancel()
+        del self._heap[:]
@@ -0,0 +1,343 @@
+# Copyright (c) 2018 Adam Coldrick
+#
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation, either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Finding the widgets in a UI tree.
+
+Each UI tree built by `yamlui.generate_ui` has a `UITree` in
+`yamlui.trees`, which indexes its widgets by name, type and style, and
+can find widgets using CSS-like selectors.
+
+Example usage::
+
+    tree = yamlui.trees['newgame.yaml']
+    panel = tree['township-container']
+    labels = tree.select('container#township-container > label.text-muted')
+    buttons = tree.by_type('button')
+
+"""
+
+import collections
+import re
+import uuid
+
+import yamlui
+
+
+_SELECTOR_TOKEN = re.compile(r'\s*(>)\s*|\s+|([^\s>]+)')
+_COMPOUND = re.compile(r'^(\*|[\w-]+)?((?:[#.][\w-]+)*)$')
+_QUALIFIER = re.compile(r'([#.])([\w-]+)')
+
+
+def get_name(widget):
+    """Get a unique name for the widget.
+
+    If the widget's properties contain `name`, then use that. Otherwise
+    generate it a uuid.
+
+    :param widget: The widget to get a name for.
+
+    """
+    return widget._properties.get('name', uuid.uuid4())
+
+
+def definition_names(definition):
+    """Return the names given to widgets in a definition.
+
+    :param definition: The definition of a widget, whose name and the names
+        of its descendants are returned.
+
+    """
+    names = []
+    if 'name' in definition.get('properties', {}):
+        names.append(definition['properties']['name'])
+    for child_definition in definition.get('children', []):
+        names.extend(definition_names(child_definition))
+    return names
+
+
+def _is_placeholder(widget):
+    # Placeholders for widgets which haven't been built yet, see
+    # `yamlui.parsing.LazyWidget`.
+    return hasattr(widget, 'materialise')
+
+
+def _widget_class(widget):
+    # Placeholders are indexed as the class of the widget they will build.
+    if _is_placeholder(widget):
+        return yamlui.class_mapping.get(widget.object_type, type(widget))
+    return type(widget)
+
+
+class Compound(object):
+
+    """One part of a selector, such as `label#title.text-muted`."""
+
+    def __init__(self, text):
+        match = _COMPOUND.match(text)
+        if match is None:
+            raise Exception('Invalid selector: %s' % text)
+        self.object_type = match.group(1)
+        if self.object_type == '*':
+            self.object_type = None
+        self.name = None
+        self.styles = []
+        for kind, value in _QUALIFIER.findall(match.group(2)):
+            if kind == '#':
+                self.name = value
+            else:
+                self.styles.append(value)
+
+    def matches(self, widget):
+        """Return whether a widget matches this part of the selector."""
+        if (self.object_type is not None and
+                widget.object_type != self.object_type):
+            return False
+        if (self.name is not None and
+                widget._properties.get('name') != self.name):
+            return False
+        return all(style in widget.styles for style in self.styles)
+
+
+def parse_selector(selector):
+    """Parse a selector into its parts.
+
+    :param selector: A selector made of parts like `type#name.style`, any
+        of which may be left out, separated by spaces to match descendants
+        or `>` to match children.
+    :returns: A list of (combinator, `Compound`) tuples, with the last
+        part of the selector first. Each combinator says how the part
+        relates to the one before it in the list, and is ' ' or '>'.
+
+    """
+    parts = []
+    combinator = None
+    for child, text in _SELECTOR_TOKEN.findall(selector):
+        if child:
+            combinator = '>'
+        elif text:
+            parts.append((combinator or ' ', Compound(text)))
+            combinator = None
+        elif combinator is None and parts:
+            combinator = ' '
+    if not parts or combinator == '>':
+        raise Exception('Invalid selector: %s' % selector)
+    parts.reverse()
+    # Shift the combinators so that each belongs to the part it leads to.
+    return [(parts[index - 1][0] if index else None, compound)
+            for index, (_, compound) in enumerate(parts)]
+
+
+def _matches_ancestors(widget, parts):
+    """Return whether a widget's ancestors match the rest of a selector."""
+    if not parts:
+        return True
+    (combinator, compound), rest = parts[0], parts[1:]
+    ancestor = widget.parent
+    while ancestor is not None:
+        if compound.matches(ancestor) and _matches_ancestors(ancestor, rest):
+            return True
+        if combinator == '>':
+            return False
+        ancestor = ancestor.parent
+    return False
+
+
+class UITree(dict):
+
+    """A dict of the widgets in a UI tree, keyed by their names.
+
+    Widgets are also indexed by their type, class and style names. Widgets
+    without a name get a random one. The indexes are kept up to date by
+    `add` and `remove`, which are called when a widget is added to or
+    removed from the tree.
+
+    Looking up a widget which hasn't been built yet, because it is hidden
+    and the tree was built in lazy mode, builds it. So do the other
+    queries. Iterating over the values gives the placeholders instead.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(UITree, self).__init__(*args, **kwargs)
+        self._names = {}
+        self._by_type = {}
+        self._by_class = {}
+        self._by_style = {}
+
+    def __getitem__(self, name):
+        widget = super(UITree, self).__getitem__(name)
+        # Building a placeholder can leave the widget behind a placeholder
+        # for one of its hidden descendants, so keep going until it's built.
+        while _is_placeholder(widget):
+            widget.materialise()
+            widget = super(UITree, self).__getitem__(name)
+        return widget
+
+    def get(self, name, default=None):
+        if name in self:
+            return self[name]
+        return default
+
+    def _entries(self, widget):
+        if _is_placeholder(widget):
+            # Names in the unbuilt subtree all refer to the placeholder.
+            names = [get_name(widget)]
+            for child_definition in widget.definition.get('children', []):
+                names.extend(definition_names(child_definition))
+            yield widget, names
+            return
+
+        yield widget, [get_name(widget)]
+        for child in getattr(widget, 'children', []):
+            for entry in self._entries(child):
+                yield entry
+
+    def add(self, widget):
+        """Add a widget and its descendants to the indexes.
+
+        Nothing is added if any of their names are already in use.
+
+        :param widget: The widget to add.
+
+        """
+        entries = list(self._entries(widget))
+        names = [name for _, entry_names in entries for name in entry_names]
+        if (len(set(names)) != len(names) or
+                any(name in self for name in names)):
+            raise Exception('Duplicate widget name')
+
+        for widget, names in entries:
+            for name in names:
+                super(UITree, self).__setitem__(name, widget)
+            self._names[widget] = names
+            self._by_type.setdefault(
+                widget.object_type, collections.OrderedDict())[widget] = None
+            self._by_class.setdefault(
+                _widget_class(widget),
+                collections.OrderedDict())[widget] = None
+            for style in widget.styles:
+                self._by_style.setdefault(
+                    style, collections.OrderedDict())[widget] = None
+
+    def remove(self, widget):
+        """Remove a widget and its descendants from the indexes.
+
+        :param widget: The widget to remove.
+
+        """
+        for child in getattr(widget, 'children', []):
+            self.remove(child)
+        for name in self._names.pop(widget, []):
+            super(UITree, self).__delitem__(name)
+        for index, key in ([(self._by_type, widget.object_type),
+                            (self._by_class, _widget_class(widget))] +
+                           [(self._by_style, style)
+                            for style in widget.styles]):
+            widgets = index.get(key)
+            if widgets is not None:
+                widgets.pop(widget, None)
+                if not widgets:
+                    del index[key]
+
+    def replace(self, placeholder, widget):
+        """Replace the entries for a placeholder with the real widgets.
+
+        :param placeholder: The placeholder which has been built.
+        :param widget: The widget which was built.
+
+        """
+        self.remove(placeholder)
+        self.add(widget)
+
+    def name_of(self, widget):
+        """Return the key a widget is stored under.
+
+        :param widget: A widget in the tree.
+
+        """
+        return self._names[widget][0]
+
+    def _built(self, widgets):
+        # Build any placeholders, since their real widgets were asked for.
+        widgets = list(widgets)
+        return [widget.materialise() if _is_placeholder(widget) else widget
+                for widget in widgets]
+
+    def by_type(self, object_type):
+        """Return the widgets of a type, such as 'label'.
+
+        :param object_type: The `object` given in the widgets' definitions.
+
+        """
+        return self._built(self._by_type.get(object_type, ()))
+
+    def by_class(self, widget_class):
+        """Return the widgets which are instances of a class.
+
+        :param widget_class: The class, for example `yamlui.Label`.
+
+        """
+        found = []
+        for cls, widgets in list(self._by_class.items()):
+            if issubclass(cls, widget_class):
+                found.extend(widgets)
+        return self._built(found)
+
+    def by_style(self, style):
+        """Return the widgets which use a style.
+
+        :param style: The name of the style.
+
+        """
+        return self._built(self._by_style.get(style, ()))
+
+    def select(self, selector):
+        """Return the widgets which match a selector.
+
+        Selectors are like CSS selectors. `label.text-muted` matches labels
+        using the `text-muted` style, `#window button` matches buttons
+        anywhere below the widget named `window`, and `container > label`
+        matches labels which are children of containers.
+
+        Hidden widgets which haven't been built yet only match on their
+        own name, type and styles, since their descendants don't exist.
+
+        :param selector: The selector, see `parse_selector`.
+
+        """
+        parts = parse_selector(selector)
+        (_, compound), rest = parts[0], parts[1:]
+        if compound.name is not None:
+            candidates = [super(UITree, self).get(compound.name)]
+        elif compound.styles:
+            candidates = self._by_style.get(compound.styles[0], ())
+        elif compound.object_type is not None:
+            candidates = self._by_type.get(compound.object_type, ())
+        else:
+            candidates = self._names
+        return self._built(
+            widget for widget in list(candidates)
+            if widget is not None and compound.matches(widget) and
+            _matches_ancestors(widget, rest))
+
+    def select_one(self, selector):
+        """Return the first widget matching a selector, or None.
+
+        :param selector: The selector, see `select`.
+
+        """
+        found = self.select(selector)
+        return found[0] if found else None
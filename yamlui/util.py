@@ -16,6 +16,39 @@
 import pygame
 
 import yamlui
+from yamlui.cache import LRUCache
+
+
+def surface_bytes(surface):
+    """Return the number of bytes used by the pixels of a surface."""
+    return surface.get_pitch() * surface.get_height()
+
+
+#: Rendered lines of text, shared by all widgets. Keys are tuples of
+#: (font, text, colour, antialias). Use `text_cache.stats()` to see how
+#: well it is working, and `text_cache.set_budget()` to change the
+#: maximum number of bytes it may hold.
+text_cache = LRUCache(8 * 1024 * 1024, sizeof=surface_bytes)
+
+
+def render_line(line, font, colour=(255, 255, 255), antialias=True):
+    """Render a single line of text, reusing a cached copy if possible.
+
+    The returned surface is shared with anything else rendering the same
+    text, so it must not be modified.
+
+    :param line: The text to render.
+    :param font: The font to render in.
+    :param colour: The colour to render the font in, default is white.
+    :param antialias: Whether to antialias the text, default is True.
+
+    """
+    key = (font, line, tuple(colour), antialias)
+    rendered = text_cache.get(key)
+    if rendered is None:
+        rendered = text_cache.put(
+            key, font.render(line, antialias, colour).convert_alpha())
+    return rendered
 
 
 def create_surface(widget, surface_class=pygame.Surface, alpha=0,
@@ -44,9 +77,12 @@ def create_surface(widget, surface_class=pygame.Surface, alpha=0,
     else:
         properties = widget._properties
 
-    # Set image if one is defined
+    # Set image if one is defined. It is shared with other widgets, so
+    # is copied if it needs modifying or could be modified by the caller.
     if 'image' in properties:
-        image = pygame.image.load(properties['image']).convert_alpha()
+        image = widget.use_image(properties['image'])
+        if surface_class == pygame.Surface or 'opacity' in properties:
+            image = image.copy()
 
     # Fall back to block colour
     elif any(key in properties for key in ['colour', 'color']):
@@ -54,7 +90,7 @@ def create_surface(widget, surface_class=pygame.Surface, alpha=0,
         height = properties['height']
         background = properties.get('colour', properties.get('color'))
         if len(background) < 4 and alpha == pygame.SRCALPHA:
-            background.append(255)
+            background = list(background) + [255]
         image = pygame.Surface((width, height), flags=alpha)
         image.fill(background)
 
@@ -79,12 +115,146 @@ def create_surface(widget, surface_class=pygame.Surface, alpha=0,
     return surface
 
 
-def wrap_text(text, font, width):
+def flush_blits(surface, blits):
+    """Blit a list of surfaces onto a surface in one call, then empty it.
+
+    :param surface: The surface to draw on.
+    :param blits: A list of argument tuples for `surface.blit`, as given
+        to `pygame.Surface.blits`.
+
+    """
+    if blits:
+        surface.blits(blits, doreturn=False)
+        del blits[:]
+
+
+def merge_rects(rects, bounds=None):
+    """Merge a list of rects into a list of non-overlapping rects.
+
+    Any rects which overlap are replaced by their union, so that no area
+    is repainted twice.
+
+    :param rects: The rects to merge.
+    :param bounds: (Optional) A rect to clip the results to. Any rects
+        which end up empty after clipping are dropped.
+
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        if bounds is not None:
+            rect = rect.clip(bounds)
+        if rect.width == 0 or rect.height == 0:
+            continue
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+#: Widths of words and spaces, keyed on (font, text), used when wrapping.
+_width_cache = LRUCache(65536)
+
+
+def _measure(font, text):
+    """Return the rendered width of some text, memoised per font."""
+    key = (font, text)
+    width = _width_cache.get(key)
+    if width is None:
+        width = _width_cache.put(key, font.size(text)[0])
+    return width
+
+
+def _wrap_line(line, font, width):
+    """Wrap a single line of text which ends with a space.
+
+    This finds the same break points as measuring every candidate prefix
+    of the line, but estimates each prefix's width by adding up the
+    memoised widths of its words instead. Rendered widths don't add up
+    exactly because of kerning and rounding, so the estimate is trusted
+    only when it is clear of the limit by an error margin which grows with
+    the number of words added up. Otherwise the prefix is measured.
+
+    :param line: The line to wrap, which must end with a space.
+    :param font: The font the text will be rendered in.
+    :param width: The width to wrap to.
+
+    """
+    slack = 2 + font.get_height() // 3
+    wrapped_lines = []
+
+    # Get the leftmost space ignoring leading whitespace
+    base = 0
+    start = line.index(' ', len(line) - len(line.lstrip()))
+    accepted = _measure(font, line[base:start])
+    joins = 0
+    while start + 1 < len(line):
+        # Get the next potential splitting point
+        next = line.index(' ', start + 1)
+        estimate = accepted + _measure(font, line[start:next])
+        joins += 1
+        margin = joins * slack
+        if estimate + margin <= width:
+            fits = True
+        elif estimate - margin > width:
+            fits = False
+        else:
+            estimate = font.size(line[base:next])[0]
+            joins = 0
+            fits = estimate <= width
+
+        if fits:
+            start = next
+            accepted = estimate
+        else:
+            wrapped_lines.append(line[base:start])
+            base = start + 1
+            start = line.index(' ', base)
+            accepted = _measure(font, line[base:start])
+            joins = 0
+    if base < len(line) - 1:
+        wrapped_lines.append(line[base:-1])
+    return wrapped_lines
+
+
+def _break_line(line, font, width):
+    """Split a line which is too wide into pieces which fit the width.
+
+    :param line: The line to split.
+    :param font: The font the text will be rendered in.
+    :param width: The width to fit to.
+
+    """
+    pieces = []
+    while len(line) > 1 and font.size(line)[0] > width:
+        # Find the longest prefix which fits, keeping at least one
+        # character so that progress is always made.
+        low, high = 1, len(line) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if font.size(line[:middle])[0] <= width:
+                low = middle
+            else:
+                high = middle - 1
+        pieces.append(line[:low])
+        line = line[low:]
+    pieces.append(line)
+    return pieces
+
+
+def wrap_text(text, font, width, break_long_words=False):
     """Wrap text to fit inside a given width when rendered.
 
+    Lines are broken at spaces. A word which is wider than the width on
+    its own is left on a line by itself, unless `break_long_words` is set.
+
     :param text: The text to be wrapped.
     :param font: The font the text will be rendered in.
     :param width: The width to wrap to.
+    :param break_long_words: (Optional) If True, split words which are
+        wider than the width across multiple lines. Defaults to False.
 
     """
     text_lines = text.replace('\t', '    ').split('\n')
@@ -97,26 +267,15 @@ def wrap_text(text, font, width):
         if line == ' ':
             wrapped_lines.append(line)
             continue
+        wrapped_lines.extend(_wrap_line(line, font, width))
 
-        # Get the leftmost space ignoring leading whitespace
-        start = len(line) - len(line.lstrip())
-        start = line.index(' ', start)
-        while start + 1 < len(line):
-            # Get the next potential splitting point
-            next = line.index(' ', start + 1)
-            if font.size(line[:next])[0] <= width:
-                start = next
-            else:
-                wrapped_lines.append(line[:start])
-                line = line[start+1:]
-                start = line.index(' ')
-        line = line[:-1]
-        if line:
-            wrapped_lines.append(line)
+    if break_long_words:
+        wrapped_lines = [piece for line in wrapped_lines
+                         for piece in _break_line(line, font, width)]
     return wrapped_lines
 
 
-def render_text_list(lines, font, colour=(255, 255, 255)):
+def render_text_list(lines, font, colour=(255, 255, 255), antialias=True):
     """Draw multiline text to a single surface with a transparent background.
 
     Draw multiple lines of text in the given font onto a single surface
@@ -125,9 +284,10 @@ def render_text_list(lines, font, colour=(255, 255, 255)):
     :param lines: The lines of text to render.
     :param font: The font to render in.
     :param colour: The colour to render the font in, default is white.
+    :param antialias: Whether to antialias the text, default is True.
 
     """
-    rendered = [font.render(line, True, colour).convert_alpha()
+    rendered = [render_line(line, font, colour, antialias)
                 for line in lines]
 
     line_height = font.get_linesize()
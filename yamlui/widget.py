@@ -13,21 +13,39 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import copy
+import inspect
+
 import pygame
 import six
+from six.moves import collections_abc
 
 import yamlui
+from yamlui import binding
+from yamlui import images
+from yamlui.util import flush_blits
+
+
+MOUSE_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN,
+                pygame.MOUSEBUTTONUP)
+if hasattr(pygame, 'MOUSEWHEEL'):
+    MOUSE_EVENTS += (pygame.MOUSEWHEEL,)
 
 
 def update_properties(properties, updated):
     """Update a properties dict with some given values.
 
+    Dicts and lists from `updated` are copied before being added, so that
+    merging further values into `properties` never modifies `updated`.
+
     :param properties: The properties dict to update.
     :param updated: The updated values to be applied.
 
     """
     for key, value in six.iteritems(updated):
         if key not in properties:
+            if isinstance(value, (dict, list)):
+                value = copy.copy(value)
             properties[key] = value
             continue
         if isinstance(value, dict):
@@ -39,32 +57,741 @@ def update_properties(properties, updated):
     return properties
 
 
+class Stylesheet(dict):
+
+    """A dict mapping style names to their properties.
+
+    Combining a list of styles is memoised, so widgets which use the same
+    list of styles share a single dict of the resulting properties.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(Stylesheet, self).__init__(*args, **kwargs)
+        self._resolved = {}
+
+    def __setitem__(self, key, value):
+        self._resolved.clear()
+        super(Stylesheet, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._resolved.clear()
+        super(Stylesheet, self).__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self._resolved.clear()
+        super(Stylesheet, self).update(*args, **kwargs)
+
+    def resolve(self, names):
+        """Return the properties from combining some styles, in order.
+
+        The returned dict is shared, and must not be modified.
+
+        :param names: A list of style names.
+
+        """
+        names = tuple(names)
+        resolved = self._resolved.get(names)
+        if resolved is None:
+            resolved = {}
+            for name in names:
+                update_properties(resolved, self.get(name, {}))
+            self._resolved[names] = resolved
+        return resolved
+
+
+def resolve_style(style, names):
+    """Combine the properties of some styles, in order.
+
+    :param style: A dict mapping style names to their properties. If this
+        is a `Stylesheet` the result is memoised and must not be modified.
+    :param names: A list of style names.
+
+    """
+    if isinstance(style, Stylesheet):
+        return style.resolve(names)
+    resolved = {}
+    for name in names:
+        update_properties(resolved, style.get(name, {}))
+    return resolved
+
+
+_MISSING = object()
+_DELETED = object()
+
+
+class PropertyMap(collections_abc.MutableMapping):
+
+    """A widget's properties, layered over a dict shared with other widgets.
+
+    Reads fall through to the shared `base` dict for keys which the widget
+    hasn't set itself, and writes only ever go to the widget's own layer.
+    Merging a dict or list value into one from the base copies it first,
+    so the base is never modified.
+
+    """
+
+    def __init__(self, base, properties=None):
+        """Initialise the properties.
+
+        :param base: The shared properties to fall back to.
+        :param properties: (Optional) Properties to merge on top of the
+            base, in the same way as `update_properties`.
+
+        """
+        self.base = base
+        self.own = {}
+        if properties:
+            self.merge(properties)
+
+    def merge(self, updated):
+        """Merge values into the properties like `update_properties`.
+
+        :param updated: The updated values to be applied.
+
+        """
+        for key, value in six.iteritems(updated):
+            current = self.get(key, _MISSING)
+            if current is _MISSING:
+                self.own[key] = value
+            elif isinstance(value, dict):
+                current = dict(current)
+                current.update(value)
+                self.own[key] = current
+            elif isinstance(value, list):
+                self.own[key] = list(current) + [value]
+            else:
+                self.own[key] = value
+
+    def __getitem__(self, key):
+        value = self.own.get(key, _MISSING)
+        if value is _MISSING:
+            return self.base[key]
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self.own.get(key, _MISSING)
+        if value is _MISSING:
+            return self.base.get(key, default)
+        if value is _DELETED:
+            return default
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __setitem__(self, key, value):
+        self.own[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.own[key] = _DELETED
+
+    def __iter__(self):
+        for key, value in six.iteritems(self.own):
+            if value is not _DELETED:
+                yield key
+        for key in self.base:
+            if key not in self.own:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, dict(self))
+
+
 class Widget(object):
 
-    """Base class which all UI widgets inherit from."""
+    """Base class which all UI widgets inherit from.
+
+    Widgets are normally drawn from, and hit by the mouse within, the rect
+    of their `surface`. Custom widgets without a surface which draw
+    themselves by overriding `draw` could draw anywhere, so they are
+    treated as covering the whole tree. They are never culled, and they
+    are given mouse events wherever they happen in the tree, see
+    `compute_bounds` and `hit_rect`.
+
+    """
+
+    #: Whether the widget can take the keyboard focus.
+    focusable = False
 
     def __init__(self, definition, style={}, parent=None):
-        resolved_properties = {}
-        for name in definition.get('style', []):
-            resolved_properties = update_properties(
-                resolved_properties, style.get(name, {}))
-        resolved_properties = update_properties(
-            resolved_properties, definition.get('properties', {}))
-
-        self._properties = resolved_properties
+        self._properties = PropertyMap(
+            resolve_style(style, definition.get('style', [])),
+            definition.get('properties', {}))
         self._children = definition.get('children', [])
         self._cb_args = definition.get('callback-args', {})
 
+        self.object_type = definition.get('object')
+        self.styles = definition.get('style', [])
+        self.stylesheet = style
         self.parent = parent
-        self.bound_object = None
+        self.visible = self._properties.get('visible', True)
+        self.lazy = self._properties.get(
+            'lazy', parent.lazy if parent is not None else False)
+        self._bounds = _MISSING
+        self._callback_cache = {}
+        self._images = []
+        # Observable objects this widget is watching, see
+        # `yamlui.binding.watch_binding`.
+        self.watching = []
+        self.updating = False
+        # Set directly rather than through the property, since nothing can
+        # have cached a lookup through a widget which is still being built.
+        self._bound_object = None
         if 'bind-object' in definition:
             obj_cb = yamlui.get_callback(
                 definition['bind-object'], widget=self)
             # TODO(SotK): Handle returning a list of objects
             if callable(obj_cb):
-                self.bound_object = obj_cb('bind-object', self)
+                self._bound_object = obj_cb('bind-object', self)
             elif isinstance(obj_cb, list):
-                self.bound_object = obj_cb[0]
+                self._bound_object = obj_cb[0]
+
+    @property
+    def bound_object(self):
+        """The object bound to this widget with `bind-object`, if any."""
+        return self._bound_object
+
+    @bound_object.setter
+    def bound_object(self, value):
+        if value is not self._bound_object:
+            self._bound_object = value
+            binding.callbacks_changed()
+
+    def _lookup(self, key):
+        """Work out how to get the value of a callback key for the widget.
+
+        :returns: A tuple of the object which has an attribute called `key`
+            and that attribute if it is a method, or (None, the callback
+            from `yamlui.callbacks`).
+
+        """
+        owner = yamlui.get_bound_object(key, self)
+        if owner is None:
+            return None, yamlui.callbacks.get(key)
+        value = getattr(owner, key)
+        return owner, value if inspect.ismethod(value) else None
+
+    def resolve_callback(self, key):
+        """Get a callback for this widget, like `yamlui.get_callback`.
+
+        Where to find the callback is worked out once and cached, until
+        `yamlui.callbacks` changes or an object is bound to a widget.
+        Methods are cached directly, other attributes of bound objects are
+        read from the object each time.
+
+        :param key: The name of the callback.
+
+        """
+        if key is None:
+            return None
+        generation = binding.generation()
+        cached = self._callback_cache.get(key)
+        if cached is None or cached[0] != generation:
+            cached = (generation,) + self._lookup(key)
+            self._callback_cache[key] = cached
+        _, owner, value = cached
+        if owner is not None and value is None:
+            value = getattr(owner, key)
+
+        if yamlui.debug_callbacks:
+            expected = yamlui.get_callback(key, self)
+            if value != expected:
+                raise Exception('Cached callback %s for %s is stale' %
+                                (key, self))
+        return value
+
+    def set_binding(self, key, value):
+        """Set the value of a two-way binding, like `two_way_callback`.
+
+        The object to set the value on is cached in the same way as in
+        `resolve_callback`.
+
+        :param key: The name of the bound attribute.
+        :param value: The new value.
+
+        """
+        generation = binding.generation()
+        cached = self._callback_cache.get(None)
+        if cached is None or cached[0] != generation:
+            cached = (generation, yamlui.get_setter_target(self))
+            self._callback_cache[None] = cached
+        target = cached[1]
+
+        if yamlui.debug_callbacks:
+            if target is not yamlui.get_setter_target(self):
+                raise Exception('Cached binding target for %s is stale' %
+                                self)
+        if target is None:
+            return yamlui.callbacks.get(key, value)
+        setattr(target, key, value)
+        return getattr(target, key)
+
+    def resolve_callbacks(self):
+        """Look up the callbacks used by this widget and its descendants.
+
+        This is done when a UI tree is built, so that the lookups don't
+        happen while the UI is running.
+
+        """
+        for widget in self.walk():
+            for key in ('on-click', 'content-bind'):
+                if key in widget._properties:
+                    widget.resolve_callback(widget._properties[key])
+
+    def schedule(self, delay, callback, repeat=False):
+        """Run a callback after a delay, using the tree's scheduler.
+
+        See `yamlui.timers.Scheduler.schedule`.
+
+        :returns: A Timer, or None if the tree has no scheduler, in which
+            case the callback is never run.
+
+        """
+        scheduler = getattr(self.root, 'scheduler', None)
+        if scheduler is None:
+            return None
+        return scheduler.schedule(delay, callback, repeat)
+
+    def use_image(self, path, mode='alpha'):
+        """Get an image from the shared image cache.
+
+        The image is released when the widget is destroyed. It is shared
+        with other widgets, so it mustn't be modified.
+
+        :param path: The path to the image file.
+        :param mode: (Optional) How to convert the image, see
+            `yamlui.images.convert`. Defaults to 'alpha'.
+
+        """
+        image = images.cache.acquire(path, mode)
+        self._images.append((path, mode))
+        return image
+
+    def destroy(self):
+        """Release the resources held by this widget and its descendants.
+
+        Their images go back to the shared image cache, where they can be
+        evicted once nothing else is using them, and they stop watching
+        the objects they are bound to. The widgets shouldn't be used
+        afterwards.
+
+        """
+        for widget in self.walk():
+            for path, mode in widget._images:
+                images.cache.release(path, mode)
+            del widget._images[:]
+            for owner in widget.watching:
+                owner.unwatch(widget)
+            del widget.watching[:]
+            widget._callback_cache.clear()
+
+    def add_child(self, child, index=None):
+        """Add a child to this widget, and to the tree's indexes.
+
+        :param child: The child widget, or a definition to build it from
+            using this widget's stylesheet.
+        :param index: (Optional) Where to insert the child in the list of
+            children. Defaults to the end, so the child is drawn on top.
+        :returns: The child widget.
+
+        """
+        if isinstance(child, dict):
+            # Imported here, since parsing imports this module.
+            from yamlui.parsing import create_widget
+            child = create_widget(child, self.stylesheet, self)
+        else:
+            child.parent = self
+        tree = getattr(self.root, 'ui_tree', None)
+        if tree is not None:
+            tree.add(child)
+        if index is None:
+            self.children.append(child)
+        else:
+            self.children.insert(index, child)
+        child.resolve_callbacks()
+
+        child.layout()
+        self.invalidate_bounds()
+        self.index_subtree(child)
+        if child.shown:
+            self.mark_dirty(child.get_bounds())
+        return child
+
+    def remove_child(self, child):
+        """Remove a child from this widget and the tree, and destroy it.
+
+        :param child: The child widget.
+
+        """
+        bounds = child.get_bounds() if child.shown else None
+        tree = getattr(self.root, 'ui_tree', None)
+        if tree is not None:
+            tree.remove(child)
+        self.unindex_subtree(child)
+        self.children.remove(child)
+        child.parent = None
+        child.destroy()
+
+        self.invalidate_bounds()
+        if bounds is not None:
+            self.mark_dirty(bounds)
+
+    def index_subtree(self, child):
+        """Add a new child and its descendants to the tree's indexes.
+
+        Only the new widgets are visited, the rest of the tree keeps its
+        place in the indexes.
+
+        :param child: The child, which must already be in `children` and
+            laid out.
+
+        """
+        root = self.root
+        index = getattr(root, 'hit_index', None)
+        if index is not None:
+            index.insert_tree(child)
+        manager = getattr(root, 'focus_manager', None)
+        if manager is not None:
+            manager.add_tree(child)
+        updates = getattr(root, 'active_updates', None)
+        if updates is not None:
+            for widget in child.walk():
+                if widget.updating:
+                    updates[widget] = None
+
+    def unindex_subtree(self, child):
+        """Remove a child and its descendants from the tree's indexes.
+
+        Any binding refreshes queued for them are dropped too.
+
+        :param child: The child, which must still be in `children`.
+
+        """
+        root = self.root
+        index = getattr(root, 'hit_index', None)
+        if index is not None:
+            index.remove_tree(child)
+        manager = getattr(root, 'focus_manager', None)
+        if manager is not None:
+            manager.remove_tree(child)
+        for name in ('active_updates', 'pending_bindings'):
+            queue = getattr(root, name, None)
+            if queue is not None:
+                for widget in child.walk():
+                    queue.pop(widget, None)
+        captured = getattr(root, 'mouse_captured', None)
+        if captured is not None:
+            captured.difference_update(child.walk())
+
+    @property
+    def root(self):
+        """The widget at the root of the tree containing this widget."""
+        widget = self
+        while widget.parent is not None:
+            widget = widget.parent
+        return widget
+
+    def walk(self):
+        """Iterate over this widget and its descendants in drawing order."""
+        yield self
+        for child in getattr(self, 'children', []):
+            for widget in child.walk():
+                yield widget
+
+    @property
+    def rect(self):
+        """The on-screen rect of this widget, or None if it has no surface."""
+        return getattr(getattr(self, 'surface', None), 'rect', None)
+
+    def get_bounds(self):
+        """Return the screen area covered by this widget and its descendants.
+
+        The result is cached until the widget or one of its descendants
+        moves or changes size, so it mustn't be modified.
+
+        :returns: A pygame.Rect, or None if nothing is visible.
+
+        """
+        if self._bounds is _MISSING:
+            self._bounds = self.compute_bounds()
+        return self._bounds
+
+    def compute_bounds(self):
+        """Work out the value to return from `get_bounds`.
+
+        Widgets which draw themselves in `draw` without having a `surface`
+        could draw anywhere, so they are given the bounds of the whole
+        tree, and are never culled. They can override this to give
+        tighter bounds.
+
+        """
+        if not self.visible:
+            return None
+        rects = [child.get_bounds()
+                 for child in getattr(self, 'children', [])]
+        rects = [rect for rect in rects if rect is not None]
+        if self.rect is not None:
+            rects.insert(0, self.rect)
+        elif self.draws_itself():
+            root_rect = self.root.rect
+            if root_rect is not None:
+                rects.insert(0, root_rect)
+        if not rects:
+            return None
+        return rects[0].unionall(rects[1:])
+
+    def draws_itself(self):
+        """Return whether the widget is drawn by its own `draw` method."""
+        return (six.get_unbound_function(type(self).draw) is not
+                six.get_unbound_function(Widget.draw))
+
+    def mark_dirty(self, rect=None):
+        """Report that a region of the screen changed because of this widget.
+
+        The region is passed to this widget and each of its ancestors in
+        turn, so that anything which caches what is on screen can react.
+
+        :param rect: The changed region, in screen coordinates. Defaults to
+            the rect of this widget.
+
+        """
+        if rect is None:
+            rect = self.rect
+        if rect is None:
+            return
+        current = self
+        while current is not None:
+            current.invalidate(rect)
+            current = current.parent
+
+    def invalidate(self, rect):
+        """Handle a change to part of this widget or one of its descendants.
+
+        Not implemented here, subclasses which cache their appearance
+        should override this.
+
+        :param rect: The changed region, in screen coordinates.
+
+        """
+        pass
+
+    def get_surfaces(self):
+        """Return all the surfaces used to draw this widget.
+
+        These all share the widget's position on screen.
+
+        """
+        surface = getattr(self, 'surface', None)
+        return [surface] if surface is not None else []
+
+    def layout(self):
+        """Work out where this widget and its descendants are on screen.
+
+        Widgets with `display: relative` are positioned relative to the top
+        left corner of their parent, others are positioned absolutely. The
+        results are stored in the rects of each widget's surfaces, so this
+        only needs calling again for the part of the tree which is affected
+        when a widget moves or changes size.
+
+        """
+        parent_rect = self.parent.rect if self.parent is not None else None
+        if (self._properties.get('display') == 'relative' and
+                parent_rect is not None and 'position' in self._properties):
+            dx, dy = self._properties['position']
+            for surface in self.get_surfaces():
+                surface.rect.topleft = (parent_rect.x + dx,
+                                        parent_rect.y + dy)
+        self.rect_changed()
+        self.layout_children()
+
+    def layout_children(self):
+        """Work out where this widget's descendants are on screen."""
+        for child in getattr(self, 'children', []):
+            child.layout()
+
+    def rect_changed(self):
+        """Let the tree know that this widget has moved or changed size.
+
+        This keeps mouse events being routed to the widget correctly, and
+        discards the cached bounds of the widget and its ancestors.
+
+        """
+        self.invalidate_bounds()
+        index = getattr(self.root, 'hit_index', None)
+        if index is not None:
+            index.update(self)
+
+    def hit_rect(self):
+        """Return the area of the screen where the widget can be hit.
+
+        This is the widget's rect, clipped to the ancestors which clip
+        their children, so that parts of the widget which aren't drawn
+        don't receive mouse events. Widgets without a surface which draw
+        themselves use the rect of the whole tree instead, like in
+        `compute_bounds`.
+
+        :returns: A pygame.Rect, or None if the widget is hidden or has no
+            rect.
+
+        """
+        rect = self.rect
+        if rect is None and self.draws_itself():
+            rect = self.root.rect
+        if rect is None or not self.visible:
+            return None
+        widget = self.parent
+        while widget is not None:
+            if not widget.visible:
+                return None
+            clip = widget.child_clip()
+            if clip is not None:
+                rect = rect.clip(clip)
+            widget = widget.parent
+        return rect
+
+    def child_clip(self):
+        """Return the rect this widget's children are clipped to, or None."""
+        return None
+
+    def invalidate_bounds(self):
+        """Discard the cached bounds of this widget and its ancestors."""
+        # Bounds are only cached once the bounds they depend on are, so
+        # the ancestors of a widget with no cached bounds don't need
+        # visiting.
+        widget = self
+        while widget is not None and widget._bounds is not _MISSING:
+            widget._bounds = _MISSING
+            widget = widget.parent
+
+    @property
+    def shown(self):
+        """Whether this widget and all of its ancestors are visible."""
+        widget = self
+        while widget is not None:
+            if not widget.visible:
+                return False
+            widget = widget.parent
+        return True
+
+    def show(self):
+        """Make the widget visible, if it was hidden.
+
+        :returns: The widget. In lazy mode this may be a different object
+            to the one `show` was called on, see `yamlui.parsing.LazyWidget`.
+
+        """
+        if not self.visible:
+            self.visible = True
+            self.visibility_changed()
+            self.mark_dirty(self.get_bounds())
+        return self
+
+    def hide(self):
+        """Make the widget and its descendants invisible.
+
+        Hidden widgets aren't drawn, updated or given mouse events, and
+        can't have the keyboard focus.
+
+        """
+        if self.visible:
+            bounds = self.get_bounds()
+            self.visible = False
+            self.visibility_changed()
+            self.mark_dirty(bounds)
+
+    def visibility_changed(self):
+        """Update the tree after this widget is shown or hidden."""
+        self.invalidate_bounds()
+        root = self.root
+        index = getattr(root, 'hit_index', None)
+        if index is not None:
+            for widget in self.walk():
+                index.update(widget)
+        manager = getattr(root, 'focus_manager', None)
+        if manager is not None:
+            manager.rebuild()
+
+    def captures_mouse(self):
+        """Return whether the widget needs mouse events wherever they occur.
+
+        Normally mouse events are only given to the widgets under the
+        cursor. Widgets should return True here while they are in a state
+        which can be changed by a mouse event elsewhere, for example a
+        button which has been pressed but not yet released.
+
+        """
+        return False
+
+    def request_focus(self):
+        """Ask for this widget to be given the keyboard focus."""
+        manager = getattr(self.root, 'focus_manager', None)
+        if manager is not None:
+            manager.set_focus(self)
+        else:
+            self.focus_gained()
+
+    def release_focus(self):
+        """Give up the keyboard focus, if this widget has it."""
+        manager = getattr(self.root, 'focus_manager', None)
+        if manager is not None:
+            manager.clear(self)
+        else:
+            self.focus_lost()
+
+    def focus_gained(self):
+        """Called when the widget is given the keyboard focus.
+
+        Not implemented here, focusable widgets should override this.
+
+        """
+        pass
+
+    def focus_lost(self):
+        """Called when the widget loses the keyboard focus.
+
+        Not implemented here, focusable widgets should override this.
+
+        """
+        pass
+
+    def hover_entered(self):
+        """Called when the mouse moves onto the widget.
+
+        See `yamlui.hover.HoverTracker`. Not implemented here, widgets
+        which look different while the mouse is over them should override
+        this.
+
+        """
+        pass
+
+    def hover_left(self):
+        """Called when the mouse moves off the widget.
+
+        Not implemented here, see `hover_entered`.
+
+        """
+        pass
+
+    def handle_own_event(self, event):
+        """Handle an event for this widget alone, ignoring any children.
+
+        This is used when the tree has already decided which widgets an
+        event should go to. By default it is the same as `handle_event`,
+        widgets with children need to override it.
+
+        :param event: The event that has occurred.
+        :returns: True if event is handled by this function, False otherwise.
+
+        """
+        return self.handle_event(event)
 
     def handle_event(self, event):
         """Handle an event that has occurred somewhere.
@@ -78,14 +805,111 @@ class Widget(object):
         """
         return False
 
+    def binding_changed(self):
+        """Called when something this widget is bound to has changed.
+
+        The widget is queued to be refreshed in the next update of the
+        tree, see `refresh_binding`.
+
+        """
+        queue = getattr(self.root, 'queue_binding_refresh', None)
+        if queue is not None:
+            queue(self)
+        else:
+            self.refresh_binding()
+
+    def refresh_binding(self):
+        """Bring the widget up to date with what it is bound to.
+
+        Not implemented here, widgets which support observable bindings
+        should override this.
+
+        """
+        pass
+
+    def request_updates(self):
+        """Ask for `update` to be called every frame.
+
+        Most widgets only change when events happen, so they aren't
+        updated at all. Widgets which change over time without any event
+        happening, for example by animating or polling a binding, should
+        call this while they are doing so, and `release_updates` when they
+        stop.
+
+        """
+        if not self.updating:
+            self.updating = True
+            updates = getattr(self.root, 'active_updates', None)
+            if updates is not None:
+                updates[self] = None
+
+    def release_updates(self):
+        """Stop `update` being called every frame."""
+        if self.updating:
+            self.updating = False
+            updates = getattr(self.root, 'active_updates', None)
+            if updates is not None:
+                updates.pop(self, None)
+
+    def needs_update(self):
+        """Return whether the widget has something to do in `update`.
+
+        See `request_updates`.
+
+        """
+        return self.updating
+
+    def is_idle(self):
+        """Return whether nothing in this part of the tree needs updating.
+
+        While the tree is idle, it only needs updating or drawing again
+        after an event occurs.
+
+        """
+        return not any(widget.needs_update() for widget in self.walk())
+
     def update(self):
         """Update the widget.
 
-        Not implemented here, subclasses should override this to be useful.
+        Only called for widgets which have called `request_updates`. Not
+        implemented here, subclasses should override this to be useful.
 
         """
         pass
 
+    def collect_children(self, surface, blits):
+        """Collect the blits for the children which are visible.
+
+        Children whose bounds don't overlap the clip area of `surface`,
+        such as those scrolled off-screen, are skipped entirely.
+
+        :param surface: The surface being drawn on.
+        :param blits: The list of blits to add to.
+
+        """
+        clip = surface.get_clip()
+        for child in getattr(self, 'children', []):
+            bounds = child.get_bounds()
+            if bounds is not None and bounds.colliderect(clip):
+                child.collect_draw(surface, blits)
+
+    def collect_draw(self, surface, blits):
+        """Add the blits which draw this widget and its children to a list.
+
+        Drawing a whole tree this way means it is drawn by a single call to
+        `surface.blits`, rather than a `blit` call for each widget. Widgets
+        which can be drawn by blitting surfaces should override this.
+
+        By default, the blits collected so far are flushed and the widget
+        is drawn with `draw`, so that it is still drawn in order.
+
+        :param surface: The surface being drawn on.
+        :param blits: The list of blits to add to.
+
+        """
+        flush_blits(surface, blits)
+        self.draw(surface)
+
     def draw(self):
         """Draw the widget.
 
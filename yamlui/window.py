@@ -13,21 +13,43 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import collections
 import sys
 
 import pygame
 
+from yamlui import images
+from yamlui.focus import FocusManager
+from yamlui.hover import HoverTracker
 from yamlui.parsing import parse_children
+from yamlui.spatial import SpatialIndex
+from yamlui.timers import Scheduler
 from yamlui.util import create_surface
+from yamlui.util import flush_blits
+from yamlui.util import merge_rects
+from yamlui.widget import MOUSE_EVENTS
 from yamlui.widget import Widget
 
 
+KEY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP)
+# Mouse events which say where the mouse is.
+POINTER_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN,
+                  pygame.MOUSEBUTTONUP)
+# Sent when the mouse leaves the window, in pygame 2.
+WINDOWLEAVE = getattr(pygame, 'WINDOWLEAVE', None)
+
+
 class Window(Widget):
 
     """A window to display on screen.
 
     This window is the place where the rest of the UI is drawn.
 
+    By default the whole window is redrawn every frame. Setting the
+    `dirty-rects` property enables dirty rectangle rendering instead,
+    where only the regions which widgets report as changed are repainted
+    and pushed to the display.
+
     Example yaml definition::
 
         - object: window
@@ -58,17 +80,103 @@ class Window(Widget):
             flags |= pygame.FULLSCREEN | pygame.HWSURFACE
         self.surface = pygame.display.set_mode(dimensions, flags)
         pygame.display.set_caption(self._properties['text'])
+        # Images preloaded by generate_ui can be converted now that the
+        # display exists.
+        images.cache.convert_decoded()
 
         self.image = create_surface(self)
+        self.dirty_rects = None
+        self.draw_list = []
+        self.pending_bindings = collections.OrderedDict()
+        self.scheduler = Scheduler()
+        # Widgets whose update method needs calling every frame, as an
+        # ordered set, see `Widget.request_updates`.
+        self.active_updates = collections.OrderedDict()
         self.children = parse_children(definition, widget=self, style=style)
+        if self._properties.get('dirty-rects', False):
+            self.set_dirty_rects(True)
+
+        self.hit_index = SpatialIndex()
+        self.hit_index.rebuild(self)
+        self.hover_tracker = HoverTracker(self.hit_index)
+        self.mouse_captured = set()
+        self.focus_manager = FocusManager(self, self.hit_index)
+
+    @property
+    def rect(self):
+        return self.surface.get_rect()
+
+    def set_dirty_rects(self, enabled):
+        """Enable or disable dirty rectangle rendering.
+
+        When enabled, only the regions passed to `mark_dirty` since the
+        last frame are redrawn, and nothing is pushed to the display in
+        frames where nothing changed.
+
+        :param enabled: True to enable dirty rectangle rendering.
+
+        """
+        if enabled:
+            self.dirty_rects = [self.rect]
+        else:
+            self.dirty_rects = None
+
+    def invalidate(self, rect):
+        """Record a changed region to be redrawn in the next frame."""
+        if self.dirty_rects is not None:
+            self.dirty_rects.append(pygame.Rect(rect))
+
+    def route_mouse_event(self, event):
+        """Give a mouse event to the widgets it is relevant to.
+
+        The event goes to the widgets under the cursor, and any which have
+        captured the mouse, topmost first until one of them handles it.
+
+        :param event: The mouse event to route.
+        :returns: True if a widget handled the event, False otherwise.
+
+        """
+        targets = set(self.hit_index.at(pygame.mouse.get_pos()))
+        targets.update(self.mouse_captured)
+        if self.focus_manager.focused is not None:
+            # Clicking elsewhere can take the focus away.
+            targets.add(self.focus_manager.focused)
+        for widget in self.hit_index.sorted(targets):
+            handled = widget.handle_own_event(event)
+            if widget.captures_mouse():
+                self.mouse_captured.add(widget)
+            else:
+                self.mouse_captured.discard(widget)
+            if handled:
+                return handled
+        return False
 
     def handle_event(self, event):
         """Handle an event that occurred in the window."""
+        if event.type in POINTER_EVENTS:
+            self.hover_tracker.move(event.pos)
+        elif event.type == WINDOWLEAVE:
+            self.hover_tracker.clear()
+        if event.type in MOUSE_EVENTS:
+            return self.route_mouse_event(event)
+
         handled = False
-        for child in reversed(self.children):
-            handled = child.handle_event(event)
+        if event.type in KEY_EVENTS:
+            # Keyboard events only go to the focused widget.
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+                self.focus_manager.cycle(
+                    reverse=bool(event.mod & pygame.KMOD_SHIFT))
+                return True
+            handled = self.focus_manager.dispatch(event)
             if handled:
                 return handled
+        else:
+            for child in reversed(self.children):
+                if not child.visible:
+                    continue
+                handled = child.handle_event(event)
+                if handled:
+                    return handled
 
         # The window should close on pygame.QUIT or the escape key going up.
         if not handled:
@@ -79,15 +187,63 @@ class Window(Widget):
                 pygame.quit()
                 sys.exit(0)
 
+    def queue_binding_refresh(self, widget):
+        """Refresh a widget's binding in the next update.
+
+        :param widget: The widget whose binding changed.
+
+        """
+        self.pending_bindings[widget] = True
+
+    def is_idle(self):
+        return not (self.dirty_rects or self.pending_bindings or
+                    self.active_updates)
+
     def update(self):
-        """Update the window, and all its child widgets."""
-        for widget in self.children:
-            widget.update()
+        """Update the window, and the widgets which need updating.
+
+        Any timers which are due are run first, then widgets whose
+        bindings have changed are refreshed. Only the widgets which have
+        asked for updates with `request_updates` are updated, rather than
+        every widget in the tree. Finally, the widgets under the mouse are
+        found again if any widgets have moved.
+
+        """
+        self.scheduler.run_due()
+        while self.pending_bindings:
+            widget, _ = self.pending_bindings.popitem(last=False)
+            widget.refresh_binding()
+        # Widgets may stop needing updates while being updated.
+        for widget in list(self.active_updates):
+            if widget.shown:
+                widget.update()
+        # Widgets may have moved under the mouse since it last moved.
+        self.hover_tracker.refresh()
 
     def draw(self):
         """Draw the window and its contents, then refresh the display."""
-        self.surface.blit(self.image, (0, 0))
-        for widget in self.children:
-            widget.draw(self.surface)
+        if self.dirty_rects is not None:
+            self.draw_dirty()
+            return
+
+        self.draw_list.append((self.image, (0, 0)))
+        self.collect_children(self.surface, self.draw_list)
+        flush_blits(self.surface, self.draw_list)
 
         pygame.display.flip()
+
+    def draw_dirty(self):
+        """Redraw only the changed regions, then refresh just those."""
+        if not self.dirty_rects:
+            return
+
+        rects = merge_rects(self.dirty_rects, self.rect)
+        self.dirty_rects = []
+        for rect in rects:
+            self.surface.set_clip(rect)
+            self.draw_list.append((self.image, rect, rect))
+            self.collect_children(self.surface, self.draw_list)
+            flush_blits(self.surface, self.draw_list)
+        self.surface.set_clip(None)
+
+        pygame.display.update(rects)